@@ -0,0 +1,288 @@
+'''
+a bot that plays the game, and a batch runner that plays lots of
+headless games with it across every CPU core. Handy for tuning
+levels without playing them by hand:
+
+    python autoplay.py -n 2000                      the normal levels
+    python autoplay.py -n 2000 --pack levels/hard.json
+    python autoplay.py --watch                      watch it play one
+
+prints completion time, deaths and hit rate per level (or JSON with
+--json). Results only depend on the seeds, so the same command gives
+the same numbers
+'''
+
+import argparse
+import json
+import multiprocessing
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+
+import backend
+import controls
+from controls import Controls
+
+
+class Bot(Controls):
+    '''
+    stands in for Controls and decides the buttons itself. It picks
+    the closest stuff, lines up a shot ahead of where it's moving,
+    fires, and gets out of the way of anything about to run into it.
+    It also tracks per level stats while it plays
+    '''
+
+    def __init__(self, game, fire_every=6, margin=6):
+        '''
+        fire_every is how many frames between shots, about what a
+        person can press. margin is how close stuff can get before
+        the bot backs off
+        '''
+
+        super().__init__()
+        self.game = game
+        self.fire_every = fire_every
+        self.margin = margin
+        self.last_fire = -fire_every
+        self.frame = 0
+        self.levels = {}
+        self.level = None
+        self.level_start = 0
+        self.level_deaths = 0
+
+    def poll(self):
+        self.frame += 1
+        self.track()
+        self.bits = self.decide()
+        return self.bits
+
+    def track(self):
+        '''
+        notice level changes and count hits and deaths. A level
+        counts as cleared when the game moves on to the next one
+        '''
+
+        game = self.game
+        if not game.in_game:
+            return
+        stats = self.levels.get(self.level)
+        if stats is not None and stats['ticks'] is None:
+            stats['deaths'] = game.player.dead_count - self.level_deaths
+            if game.level != self.level:
+                stats['ticks'] = game.ticks - self.level_start
+                stats['hits'] = stats['items']
+            else:
+                stats['hits'] = len(game.stuff.found)
+        if game.level != self.level and not game.in_trans and not game.in_end:
+            self.level = game.level
+            self.level_start = game.ticks
+            self.level_deaths = game.player.dead_count
+            self.levels[self.level] = {
+                'items': len(game.stuff.items), 'ticks': None, 'deaths': 0, 'shots': 0, 'hits': 0,
+            }
+
+    def decide(self):
+        game = self.game
+        if game.in_end:
+            return 0
+        if game.stuff.current_msg:
+            return controls.ENTER
+        if game.in_title:
+            return controls.FIRE if not game.in_trans else 0
+        if game.in_trans or not game.in_game:
+            return 0
+
+        player = game.player
+        items = game.stuff.items
+        alive = np.flatnonzero(items.alive)
+        if not len(alive):
+            return 0
+        px, py = player.x + player.w / 2, player.y + player.h / 2
+
+        # get out of the way first
+        bits = self.dodge(player, items, alive)
+        if bits:
+            return bits
+
+        # closest stuff, aim where it will be when the bullet gets there
+        cx = items.x[alive] + items.w[alive] / 2
+        cy = items.y[alive] + items.h[alive] / 2
+        target = alive[int(np.argmin(np.abs(cx - px) + np.abs(cy - py)))]
+        speed = game.stuff.level
+        tx = items.x[target] + items.w[target] / 2
+        ty = items.y[target] + items.h[target] / 2
+        if items.vertical[target]:
+            # moving down, shoot sideways at the row it's heading to
+            ty += speed * abs(tx - px) / 5
+            if abs(ty - py) > items.h[target] / 2 - 1:
+                return controls.DOWN if ty > py else controls.UP
+            face = 'right' if tx > px else 'left'
+        else:
+            # moving right, shoot up or down at the column it's heading to
+            tx += speed * abs(ty - py) / 5
+            if abs(tx - px) > items.w[target] / 2 - 1:
+                return controls.RIGHT if tx > px else controls.LEFT
+            face = 'down' if ty > py else 'up'
+        if player.last_dir != face:
+            return {'up': controls.UP, 'down': controls.DOWN,
+                    'left': controls.LEFT, 'right': controls.RIGHT}[face]
+        return self.fire()
+
+    def fire(self):
+        if self.frame - self.last_fire < self.fire_every:
+            return 0
+        self.last_fire = self.frame
+        if self.level in self.levels:
+            self.levels[self.level]['shots'] += 1
+        return controls.FIRE
+
+    def dodge(self, player, items, alive):
+        '''
+        buttons to move away from stuff that's about to hit the
+        player, 0 if nothing is close
+        '''
+
+        if player.cant_die:
+            return 0
+        margin = self.margin
+        speed = self.game.stuff.level
+        x, y = items.x[alive], items.y[alive]
+        w, h = items.w[alive], items.h[alive]
+        vertical = items.vertical[alive]
+        # reach a bit further in the direction each one is moving
+        ahead_x = np.where(vertical, 0, speed * 3)
+        ahead_y = np.where(vertical, speed * 3, 0)
+        near = ((x - margin < player.x + player.w) & (player.x < x + w + ahead_x + margin)
+                & (y - margin < player.y + player.h) & (player.y < y + h + ahead_y + margin))
+        if not near.any():
+            return 0
+        idx = int(np.flatnonzero(near)[0])
+        # step out of its lane, towards the side with more room
+        if vertical[idx]:
+            mid = x[idx] + w[idx] / 2
+            return controls.LEFT if player.x + player.w / 2 < mid and x[idx] > 15 else controls.RIGHT
+        mid = y[idx] + h[idx] / 2
+        return controls.UP if player.y + player.h / 2 < mid and y[idx] > 15 else controls.DOWN
+
+
+def play(seed, pack=None, max_frames=30 * 60 * 10, **bot_args):
+    '''
+    play one headless game with the bot. Returns a result dict
+    with per level stats
+    '''
+
+    from main import FPS, LEVEL_PACK, Game
+
+    hb = backend.use(backend.HeadlessBackend(seed=seed))
+    game = Game(seed=seed, pack=pack or LEVEL_PACK)
+    bot = game.controls = Bot(game, **bot_args)
+    frames = 0
+    while frames < max_frames and not game.in_end:
+        if not hb.step(1, draw=False):
+            break
+        frames += 1
+    return {
+        'seed': seed,
+        'finished': game.in_end,
+        'seconds': frames / FPS,
+        'deaths': game.player.dead_count,
+        'levels': {level: dict(stats, seconds=stats['ticks'] / FPS if stats['ticks'] is not None else None)
+                   for level, stats in bot.levels.items()},
+    }
+
+
+def play_star(args):
+    seed, pack, max_frames = args
+    return play(seed, pack, max_frames)
+
+
+def run_batch(games, pack=None, first_seed=0, max_frames=30 * 60 * 10, workers=None):
+    '''
+    play games seeds in parallel, one process per core by default
+    '''
+
+    jobs = [(seed, pack, max_frames) for seed in range(first_seed, first_seed + games)]
+    with multiprocessing.Pool(workers or os.cpu_count()) as pool:
+        return sorted(pool.imap_unordered(play_star, jobs, chunksize=8), key=lambda r: r['seed'])
+
+
+def summarize(results):
+    '''
+    per level averages over a batch
+    '''
+
+    levels = {}
+    for result in results:
+        for level, stats in result['levels'].items():
+            levels.setdefault(level, []).append(stats)
+    summary = {
+        'games': len(results),
+        'finished': sum(r['finished'] for r in results),
+        'seconds': statistics.mean(r['seconds'] for r in results) if results else 0,
+        'levels': {},
+    }
+    for level, runs in sorted(levels.items()):
+        done = [run['seconds'] for run in runs if run['seconds'] is not None]
+        shots = sum(run['shots'] for run in runs)
+        summary['levels'][level] = {
+            'played': len(runs),
+            'cleared': len(done),
+            'seconds_median': statistics.median(done) if done else None,
+            'seconds_p90': sorted(done)[int(len(done) * 0.9)] if done else None,
+            'deaths_mean': statistics.mean(run['deaths'] for run in runs),
+            'hit_rate': sum(run['hits'] for run in runs) / shots if shots else 0.0,
+        }
+    return summary
+
+
+def print_summary(summary, elapsed):
+    print(f"{summary['games']} games in {elapsed:.1f}s, {summary['finished']} finished, "
+          f"{summary['seconds']:.1f}s of play on average")
+    print('level  cleared  median s  p90 s  deaths  hit rate')
+    for level, row in summary['levels'].items():
+        median = f"{row['seconds_median']:8.1f}" if row['seconds_median'] is not None else '       -'
+        p90 = f"{row['seconds_p90']:6.1f}" if row['seconds_p90'] is not None else '     -'
+        print(f"{level:5}  {row['cleared']:3}/{row['played']:<4} {median}  {p90}  "
+              f"{row['deaths_mean']:6.2f}  {row['hit_rate']:7.0%}")
+
+
+def watch(seed, pack=None):
+    '''
+    let the bot play in a real window
+    '''
+
+    from main import LEVEL_PACK, Game
+
+    class Watched(Game):
+        def update(self):
+            if not isinstance(self.controls, Bot):
+                self.controls = Bot(self)
+            super().update()
+
+    Watched(seed=seed, pack=pack or LEVEL_PACK)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='play the game with a bot')
+    parser.add_argument('-n', dest='games', type=int, default=200, help='number of games')
+    parser.add_argument('--pack', help='level pack to play')
+    parser.add_argument('--seed', type=int, default=0, help='first seed')
+    parser.add_argument('--minutes', type=float, default=10, help='give up on a game after this much play')
+    parser.add_argument('-j', dest='workers', type=int, help='worker processes (default: all cores)')
+    parser.add_argument('--json', action='store_true', help='print the summary as JSON')
+    parser.add_argument('--watch', action='store_true', help='watch one game in a window')
+    args = parser.parse_args()
+
+    if args.watch:
+        watch(args.seed, args.pack)
+        sys.exit()
+    start = time.perf_counter()
+    results = run_batch(args.games, args.pack, args.seed, int(args.minutes * 60 * 30), args.workers)
+    summary = summarize(results)
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        print_summary(summary, time.perf_counter() - start)
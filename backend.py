@@ -0,0 +1,444 @@
+import random
+import time
+
+DRAW_CALLS = ('cls', 'pset', 'line', 'rect', 'rectb', 'circ', 'circb', 'elli', 'ellib', 'tri', 'trib', 'text', 'blt', 'bltm')
+
+
+class PyxelBackend:
+    '''
+    pass-through to the real pyxel module. Functions and
+    constants are cached on the instance after the first
+    lookup so the indirection only costs one attribute
+    fetch per call
+    '''
+
+    def __init__(self):
+        '''
+        import pyxel here so headless runs never need it
+        installed
+        '''
+
+        import pyxel
+        self.module = pyxel
+        self.draw_calls = 0
+
+    def __getattr__(self, name):
+        '''
+        forward anything we don't know about to pyxel. Don't
+        cache values that change over time like frame_count.
+        Screen drawing functions get wrapped to count calls
+        '''
+
+        value = getattr(self.module, name)
+        if name in DRAW_CALLS:
+            value = self.counted(value)
+        if callable(value) or name.isupper():
+            setattr(self, name, value)
+        return value
+
+    def clock(self):
+        '''
+        seconds on a monotonic wall clock
+        '''
+
+        return time.perf_counter()
+
+    def counted(self, func):
+        def wrapper(*args, **kwargs):
+            self.draw_calls += 1
+            return func(*args, **kwargs)
+        return wrapper
+
+
+class Font:
+    '''
+    stand in for pyxel.Font, nothing gets loaded
+    '''
+
+    def __init__(self, filename, font_size=None):
+        self.filename = filename
+        self.font_size = font_size
+
+
+class Sound:
+    '''
+    stand in for a pyxel sound slot
+    '''
+
+    def set(self, *args):
+        pass
+
+    def set_notes(self, notes):
+        pass
+
+
+class Image:
+    '''
+    fake framebuffer with one byte per pixel. Supports the
+    primitives the game uses so state can be inspected with pget.
+    Text has no glyph data here so it doesn't touch any pixels
+    '''
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.data = bytearray(width * height)
+        self.clip()
+
+    def clip(self, x=None, y=None, w=None, h=None):
+        '''
+        limit drawing to a rectangle, no arguments resets it
+        to the whole image. cls still clears everything
+        '''
+
+        if x is None:
+            self.clip_rect = (0, 0, self.width, self.height)
+        else:
+            self.clip_rect = (max(int(x), 0), max(int(y), 0),
+                              min(int(x + w), self.width), min(int(y + h), self.height))
+
+    def cls(self, col):
+        self.data[:] = bytes([col]) * len(self.data)
+
+    def pget(self, x, y):
+        x = int(x)
+        y = int(y)
+        if 0 <= x < self.width and 0 <= y < self.height:
+            return self.data[y * self.width + x]
+        return 0
+
+    def pset(self, x, y, col):
+        x = int(x)
+        y = int(y)
+        x0, y0, x1, y1 = self.clip_rect
+        if x0 <= x < x1 and y0 <= y < y1:
+            self.data[y * self.width + x] = col
+
+    def span(self, x0, x1, y, col):
+        '''
+        fill pixels x0 through x1 - 1 on row y
+        '''
+
+        cx0, cy0, cx1, cy1 = self.clip_rect
+        if y < cy0 or y >= cy1:
+            return
+        x0 = max(x0, cx0)
+        x1 = min(x1, cx1)
+        if x0 < x1:
+            start = y * self.width
+            self.data[start + x0:start + x1] = bytes([col]) * (x1 - x0)
+
+    def rect(self, x, y, w, h, col):
+        x = int(x)
+        y = int(y)
+        for row in range(max(y, 0), min(y + int(h), self.height)):
+            self.span(x, x + int(w), row, col)
+
+    def rectb(self, x, y, w, h, col):
+        x = int(x)
+        y = int(y)
+        w = int(w)
+        h = int(h)
+        if w <= 0 or h <= 0:
+            return
+        self.span(x, x + w, y, col)
+        self.span(x, x + w, y + h - 1, col)
+        for row in range(y + 1, y + h - 1):
+            self.pset(x, row, col)
+            self.pset(x + w - 1, row, col)
+
+    def circ(self, x, y, r, col):
+        x = int(x)
+        y = int(y)
+        r = int(r)
+        for dy in range(-r, r + 1):
+            half = int((r * r - dy * dy) ** 0.5)
+            self.span(x - half, x + half + 1, y + dy, col)
+
+    def circb(self, x, y, r, col):
+        x = int(x)
+        y = int(y)
+        r = int(r)
+        for dy in range(-r, r + 1):
+            half = int((r * r - dy * dy) ** 0.5)
+            self.pset(x - half, y + dy, col)
+            self.pset(x + half, y + dy, col)
+            self.pset(x + dy, y - half, col)
+            self.pset(x + dy, y + half, col)
+
+    def elli(self, x, y, w, h, col):
+        x = int(x)
+        y = int(y)
+        w = int(w)
+        h = int(h)
+        if w <= 0 or h <= 0:
+            return
+        rx = w / 2
+        ry = h / 2
+        for row in range(h):
+            dy = (row + 0.5 - ry) / ry
+            half = rx * max(0.0, 1 - dy * dy) ** 0.5
+            self.span(x + int(round(rx - half)), x + int(round(rx + half)), y + row, col)
+
+    def text(self, x, y, s, col, font=None):
+        pass
+
+    def blt(self, x, y, img, u, v, w, h, colkey=None, rotate=None, scale=None):
+        '''
+        copy a region of another image. rotate and scale are
+        accepted but ignored
+        '''
+
+        x = int(x)
+        y = int(y)
+        u = int(u)
+        v = int(v)
+        w = abs(int(w))
+        h = abs(int(h))
+        cx0, cy0, cx1, cy1 = self.clip_rect
+        for row in range(h):
+            dy = y + row
+            sy = v + row
+            if dy < cy0 or dy >= cy1 or sy < 0 or sy >= img.height:
+                continue
+            x0 = max(x, cx0, x - u)
+            x1 = min(x + w, cx1, x + img.width - u)
+            if x0 >= x1:
+                continue
+            src = sy * img.width + u - x
+            dst = dy * self.width
+            if colkey is None:
+                self.data[dst + x0:dst + x1] = img.data[src + x0:src + x1]
+            else:
+                for dx in range(x0, x1):
+                    col = img.data[src + dx]
+                    if col != colkey:
+                        self.data[dst + dx] = col
+
+    def bltm(self, x, y, tm, u, v, w, h, colkey=None, rotate=None, scale=None):
+        pass
+
+
+class HeadlessBackend:
+    '''
+    runs the game without a window. The frame clock only moves
+    when step() is called, input comes from hold()/script, and
+    everything is drawn into an in-memory Image. draw_calls
+    counts calls that touch the screen
+    '''
+
+    KEY_BACKSPACE = 8
+    KEY_RETURN = 13
+    KEY_SPACE = 32
+    KEY_Q = 113
+    KEY_R = 114
+    KEY_F1 = 1073741882
+    KEY_F2 = 1073741883
+    KEY_F3 = 1073741884
+    KEY_RIGHT = 1073741903
+    KEY_LEFT = 1073741904
+    KEY_DOWN = 1073741905
+    KEY_UP = 1073741906
+    GAMEPAD1_BUTTON_A = 1342177798
+    GAMEPAD1_BUTTON_B = 1342177799
+    GAMEPAD1_BUTTON_DPAD_UP = 1342177809
+    GAMEPAD1_BUTTON_DPAD_DOWN = 1342177810
+    GAMEPAD1_BUTTON_DPAD_LEFT = 1342177811
+    GAMEPAD1_BUTTON_DPAD_RIGHT = 1342177812
+    FONT_WIDTH = 4
+    FONT_HEIGHT = 6
+    NUM_COLORS = 16
+
+    Font = Font
+    Image = Image
+
+    def __init__(self, seed=0, script=None):
+        '''
+        script is an optional callable that gets the frame number and
+        returns the keys held on that frame
+        '''
+
+        self.width = 0
+        self.height = 0
+        self.frame_count = 0
+        self.fps = 30
+        self.draw_calls = 0
+        self.screen = None
+        self.images = [Image(256, 256) for _ in range(3)]
+        self.sounds = [Sound() for _ in range(64)]
+        self.script = script
+        self.keys = set()
+        self.prev_keys = set()
+        self.rng = random.Random(seed)
+        self.callbacks = None
+        self.running = False
+        self.reset_requested = False
+
+    def init(self, width, height, fps=30, **kwargs):
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.screen = Image(width, height)
+
+    def run(self, update, draw):
+        '''
+        unlike pyxel.run this returns right away, frames are
+        driven by step()
+        '''
+
+        self.callbacks = (update, draw)
+        self.running = True
+
+    def step(self, frames=1, keys=None, draw=True):
+        '''
+        advance the game by some number of frames. If keys is given
+        those are held for all the frames, otherwise the script (if
+        any) decides. draw=False skips drawing for runs nobody
+        watches. Returns the number of frames actually run
+        '''
+
+        update, render = self.callbacks
+        for count in range(frames):
+            if not self.running:
+                return count
+            self.prev_keys = self.keys
+            if keys is not None:
+                self.keys = set(keys)
+            elif self.script:
+                self.keys = set(self.script(self.frame_count))
+            update()
+            if draw:
+                render()
+            self.frame_count += 1
+        return frames
+
+    def clock(self):
+        '''
+        time as seen by the game, exactly one frame per step
+        '''
+
+        return self.frame_count / self.fps
+
+    def hold(self, *keys):
+        '''
+        hold keys down until they are released
+        '''
+
+        self.keys = self.keys | set(keys)
+
+    def release(self, *keys):
+        self.keys = self.keys - set(keys)
+
+    def btn(self, key):
+        return key in self.keys
+
+    def btnp(self, key, hold=None, repeat=None):
+        return key in self.keys and key not in self.prev_keys
+
+    def btnr(self, key):
+        return key in self.prev_keys and key not in self.keys
+
+    def rseed(self, seed):
+        self.rng.seed(seed)
+
+    def rndi(self, a, b):
+        return self.rng.randint(a, b)
+
+    def quit(self):
+        self.running = False
+
+    def reset(self):
+        '''
+        there is no process to restart, stop stepping and let
+        the caller build a new Game
+        '''
+
+        self.reset_requested = True
+        self.running = False
+
+    def play(self, ch, snd, **kwargs):
+        pass
+
+    def playm(self, msc, **kwargs):
+        pass
+
+    def stop(self, ch=None):
+        pass
+
+    def cls(self, col):
+        self.draw_calls += 1
+        self.screen.cls(col)
+
+    def pget(self, x, y):
+        return self.screen.pget(x, y)
+
+    def clip(self, x=None, y=None, w=None, h=None):
+        self.screen.clip(x, y, w, h)
+
+    def pset(self, x, y, col):
+        self.draw_calls += 1
+        self.screen.pset(x, y, col)
+
+    def rect(self, x, y, w, h, col):
+        self.draw_calls += 1
+        self.screen.rect(x, y, w, h, col)
+
+    def rectb(self, x, y, w, h, col):
+        self.draw_calls += 1
+        self.screen.rectb(x, y, w, h, col)
+
+    def circ(self, x, y, r, col):
+        self.draw_calls += 1
+        self.screen.circ(x, y, r, col)
+
+    def circb(self, x, y, r, col):
+        self.draw_calls += 1
+        self.screen.circb(x, y, r, col)
+
+    def elli(self, x, y, w, h, col):
+        self.draw_calls += 1
+        self.screen.elli(x, y, w, h, col)
+
+    def text(self, x, y, s, col, font=None):
+        self.draw_calls += 1
+        self.screen.text(x, y, s, col, font)
+
+    def blt(self, x, y, img, u, v, w, h, colkey=None, rotate=None, scale=None):
+        self.draw_calls += 1
+        if isinstance(img, int):
+            img = self.images[img]
+        self.screen.blt(x, y, img, u, v, w, h, colkey, rotate, scale)
+
+    def bltm(self, x, y, tm, u, v, w, h, colkey=None, rotate=None, scale=None):
+        self.draw_calls += 1
+        self.screen.bltm(x, y, tm, u, v, w, h, colkey, rotate, scale)
+
+
+active = None
+
+
+def use(backend):
+    '''
+    make backend the one every pyxel.* call in the game goes to
+    '''
+
+    global active
+    active = backend
+    return backend
+
+
+class Proxy:
+    '''
+    what main.py imports as "pyxel". Looks up attributes on the
+    active backend, falling back to the real pyxel module
+    '''
+
+    __slots__ = ()
+
+    def __getattr__(self, name):
+        if active is None:
+            use(PyxelBackend())
+        return getattr(active, name)
+
+
+pyxel = Proxy()
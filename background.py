@@ -0,0 +1,86 @@
+'''
+rotating tilemap background. Rotating the whole tilemap with bltm
+every frame is too slow, so a full turn is cut into steps and each
+step gets drawn once into an off-screen image, after that showing
+it is a plain blt of the nearest step. Frames are made the first
+time they're needed, or all at once with prerender(), and the least
+recently shown ones are dropped when they'd take up more than
+budget pixels
+'''
+
+from collections import OrderedDict
+
+from backend import pyxel
+from render import BACKGROUND, screen
+
+
+class Background:
+    '''
+    cache of pre-rotated frames of a w x h part of a tilemap
+    '''
+
+    def __init__(self, tm=0, u=0, v=0, w=200, h=155, steps=72, budget=256 * 256 * 4):
+        '''
+        tm, u, v, w, h are what bltm would get. steps is how many
+        frames make a full turn (72 is every 5 degrees) and budget
+        is the max number of cached pixels, by default 8 frames
+        of the whole screen
+        '''
+
+        self.tm = tm
+        self.u = u
+        self.v = v
+        self.w = w
+        self.h = h
+        self.steps = steps
+        self.budget = budget
+        self.used = 0
+        self.frames = OrderedDict()
+        self.renders = 0
+
+    def step(self, deg):
+        '''
+        the rotation step closest to deg
+        '''
+
+        return round(deg % 360 * self.steps / 360) % self.steps
+
+    def frame(self, deg, scale=1):
+        '''
+        image of the tilemap rotated to the step nearest deg,
+        rendering it if it isn't cached
+        '''
+
+        key = (self.step(deg), scale)
+        img = self.frames.get(key)
+        if img is not None:
+            self.frames.move_to_end(key)
+            return img
+        size = self.w * self.h
+        while self.frames and self.used + size > self.budget:
+            self.frames.popitem(last=False)
+            self.used -= size
+        img = pyxel.Image(self.w, self.h)
+        img.bltm(0, 0, self.tm, self.u, self.v, self.w, self.h,
+                 rotate=key[0] * 360 / self.steps, scale=scale)
+        self.frames[key] = img
+        self.used += size
+        self.renders += 1
+        return img
+
+    def prerender(self, scale=1):
+        '''
+        render every step ahead of time, or as many as fit in the
+        budget
+        '''
+
+        count = min(self.steps, self.budget // (self.w * self.h))
+        for step in range(count):
+            self.frame(step * 360 / self.steps, scale)
+
+    def draw(self, x, y, deg, scale=1, layer=BACKGROUND):
+        screen.blt(x, y, self.frame(deg, scale), 0, 0, self.w, self.h, layer=layer)
+
+    def clear(self):
+        self.frames.clear()
+        self.used = 0
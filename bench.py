@@ -0,0 +1,325 @@
+'''
+benchmarks for the game loop's hot paths, run headless.
+
+    python bench.py                          run everything, print JSON
+    python bench.py -o results.json          also write the JSON to a file
+    python bench.py --baseline bench_baseline.json
+                                             compare against a baseline,
+                                             exit 1 on a regression
+    python bench.py --save bench_baseline.json
+                                             store a new baseline
+    python bench.py -k bullet_hit            only matching scenarios
+
+Times are microseconds per call (or per frame for the frame
+scenarios). Regressions are judged on the median, and a scenario
+that looks slower is run again (--retries) before it counts
+'''
+
+import argparse
+import itertools
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+
+import numpy as np
+
+import backend
+from bullets import BulletPool
+from collision import overlap_mask
+from paths import PATHS
+
+SCENARIOS = []
+
+
+def scenario(name, **params):
+    '''
+    register a benchmark, run once for every combination of params
+    '''
+
+    def register(func):
+        keys = list(params)
+        for values in itertools.product(*params.values()):
+            args = dict(zip(keys, values))
+            label = name + ''.join(f'[{key}={value}]' for key, value in args.items())
+            SCENARIOS.append((label, func, args))
+        return func
+    return register
+
+
+def new_game(items=None, clear=None):
+    '''
+    fresh headless game, optionally with a generated level of items
+    kept out of the clear rect
+    '''
+
+    from main import Game
+
+    hb = backend.use(backend.HeadlessBackend(seed=1))
+    game = Game(seed=1)
+    if items:
+        game.stuff.set_items(make_items(items, clear=clear))
+    return hb, game
+
+
+def make_items(count, seed=1, paths=(), clear=None):
+    '''
+    count random items, each on one of paths if any are given. With
+    clear, an (x, y, w, h) rect, spots that would overlap it are
+    picked again so it stays empty
+    '''
+
+    rng = random.Random(seed)
+
+    def spot():
+        while True:
+            x, y = rng.randint(0, 190), rng.randint(0, 145)
+            if not clear or not overlap_mask(x, y, 10, 10, *clear):
+                return x, y
+
+    items = []
+    for idx in range(count):
+        d, t = rng.choice('xy'), rng.choice('JSF')
+        x, y = spot()
+        items.append({
+            'd': d, 't': t, 'x': x, 'y': y,
+            'w': 10, 'h': 10, 'bg': rng.choice((1, 2, 4)), 'msg': f'item {idx}',
+            'path': rng.choice(paths) if paths else None,
+        })
+    return items
+
+
+def start_playing(hb, game):
+    '''
+    skip the title and transition, and make the player unable to die
+    so frames stay in gameplay
+    '''
+
+    game.scenes.rebuild(['play'])
+    game.player.cant_die = 10 ** 9
+
+
+def load_bullets(game, count, miss=True):
+    '''
+    fill the bullet pool with count bullets at random spots. With miss
+    set, spots on top of stuff are skipped so calls don't change state
+    '''
+
+    rng = random.Random(count)
+    items = game.stuff.items
+    pool = game.player.bullets = BulletPool(max(count, 64))
+    while len(pool) < count:
+        x, y = rng.randint(0, 199), rng.randint(0, 154)
+        if miss and items.overlapping(x, y, 1, 1, list(range(len(items)))):
+            continue
+        pool.spawn(x, y, rng.choice(('up', 'down', 'left', 'right')))
+    return pool
+
+
+def timed(func, number):
+    '''
+    per call times in microseconds
+    '''
+
+    clock = time.perf_counter
+    samples = []
+    for _ in range(number):
+        start = clock()
+        func()
+        samples.append((clock() - start) * 1e6)
+    return samples
+
+
+@scenario('bullet_hit', items=(10, 100, 1000), bullets=(1, 16, 64))
+def bench_bullet_hit(items, bullets, number):
+    hb, game = new_game(items)
+    load_bullets(game, bullets)
+    return timed(game.player.bullet_hit, number)
+
+
+@scenario('player_hit', items=(10, 100, 1000))
+def bench_player_hit(items, number):
+    '''
+    the player standing in a spot kept clear of stuff, so every call
+    is a miss, which is what nearly every frame is
+    '''
+
+    rect = {'x': 80, 'y': 60, 'w': 10, 'h': 10}
+    hb, game = new_game(items, clear=tuple(rect.values()))
+    player = game.player
+    if game.stuff.items.overlapping(rect['x'], rect['y'], rect['w'], rect['h'], list(range(items))):
+        raise RuntimeError('player_hit spot is not clear')
+
+    def miss():
+        player.is_dead = False
+        player.player_hit(rect)
+    samples = timed(miss, number)
+    if player.dead_count:
+        raise RuntimeError('player_hit scenario hit something')
+    return samples
+
+
+@scenario('move_bullets', bullets=(1, 16, 64))
+def bench_move_bullets(bullets, number):
+    hb, game = new_game()
+    samples = []
+    for _ in range(number):
+        load_bullets(game, bullets, miss=False)
+        samples.extend(timed(game.player.move_bullets, 1))
+    return samples
+
+
+@scenario('stuff_update', items=(10, 100, 1000))
+def bench_stuff_update(items, number):
+    hb, game = new_game(items)
+    counter = itertools.count(1)
+    return timed(lambda: game.stuff.update(next(counter)), number)
+
+
+@scenario('stuff_paths', items=(10, 100, 1000))
+def bench_stuff_paths(items, number):
+    hb, game = new_game()
+    game.stuff.set_items(make_items(items, paths=tuple(PATHS)))
+    counter = itertools.count(1)
+    return timed(lambda: game.stuff.update(next(counter)), number)
+
+
+@scenario('frame', items=(10, 100, 1000))
+def bench_frame(items, number):
+    hb, game = new_game(items)
+    start_playing(hb, game)
+    return timed(hb.step, number)
+
+
+@scenario('background_frame')
+def bench_background_frame(number):
+    hb, game = new_game(10)
+    start_playing(hb, game)
+    game.rotate_bg = True
+    return timed(hb.step, number)
+
+
+@scenario('particle_frame', particles=(100, 512, 4096))
+def bench_particle_frame(particles, number):
+    hb, game = new_game(10)
+    start_playing(hb, game)
+    pool = game.particles
+    samples = []
+    while len(samples) < number:
+        pool.clear()
+        pool.burst(100, 80, particles, 1.0, 10 ** 4, (7, 8, 9, 10))
+        samples.extend(timed(hb.step, min(20, number - len(samples))))
+    return samples
+
+
+@scenario('msg_frame', kind=('S', 'BOSS'))
+def bench_msg_frame(kind, number):
+    hb, game = new_game()
+    start_playing(hb, game)
+    game.stuff.show('BOSS' if kind == 'BOSS' else 'Python expert 15+ years', 'F' if kind == 'BOSS' else kind)
+    return timed(hb.step, number)
+
+
+@scenario('title_frame')
+def bench_title_frame(number):
+    samples = []
+    while len(samples) < number:
+        hb, game = new_game()
+        samples.extend(timed(hb.step, min(150, number - len(samples))))
+    return samples
+
+
+@scenario('transition_frame')
+def bench_transition_frame(number):
+    hb, game = new_game()
+    start_playing(hb, game)
+    samples = []
+    while len(samples) < number:
+        game.trans_r = 0
+        game.scenes.push(game.scenes.make('trans'))
+        while game.in_trans and len(samples) < number:
+            samples.extend(timed(hb.step, 1))
+    return samples
+
+
+def run(pattern=None, number=200, labels=None):
+    results = {}
+    for label, func, args in SCENARIOS:
+        if pattern and pattern not in label:
+            continue
+        if labels is not None and label not in labels:
+            continue
+        samples = func(number=number, **args)
+        results[label] = {
+            'median_us': round(statistics.median(samples), 3),
+            'min_us': round(min(samples), 3),
+            'samples': len(samples),
+        }
+    return {
+        'meta': {
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'machine': platform.machine(),
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'results': results,
+    }
+
+
+def compare(results, baseline, tolerance):
+    '''
+    scenarios whose median got slower than the baseline by more
+    than tolerance (0.25 is 25%)
+    '''
+
+    slower = []
+    for label, base in baseline['results'].items():
+        now = results['results'].get(label)
+        if now is None:
+            continue
+        ratio = now['median_us'] / base['median_us'] if base['median_us'] else 1.0
+        if ratio > 1 + tolerance:
+            slower.append((label, base['median_us'], now['median_us'], ratio))
+    return slower
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='benchmark the game loop')
+    parser.add_argument('-k', dest='pattern', help='only run scenarios containing this')
+    parser.add_argument('-n', dest='number', type=int, default=200, help='samples per scenario')
+    parser.add_argument('-o', dest='output', help='write results JSON here')
+    parser.add_argument('--baseline', help='baseline JSON to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='allowed slowdown, 0.25 = 25%%')
+    parser.add_argument('--retries', type=int, default=2, help='re-runs of a scenario that looks slower')
+    parser.add_argument('--save', metavar='FILE', help='write results as the new baseline')
+    args = parser.parse_args()
+
+    results = run(args.pattern, args.number)
+    text = json.dumps(results, indent=2)
+    print(text)
+    for path in (args.output, args.save):
+        if path:
+            with open(path, 'w') as f:
+                f.write(text + '\n')
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        slower = compare(results, baseline, args.tolerance)
+        for _ in range(args.retries):
+            if not slower:
+                break
+            # one slow run is often just the machine being busy, so
+            # it only counts if the re-runs are slow too
+            again = run(args.pattern, args.number, {label for label, *_ in slower})
+            for label, now in again['results'].items():
+                if now['median_us'] < results['results'][label]['median_us']:
+                    results['results'][label] = now
+            slower = compare(results, baseline, args.tolerance)
+        for label, before, after, ratio in slower:
+            print(f'REGRESSION {label}: {before:.1f}us -> {after:.1f}us ({ratio:.2f}x)', file=sys.stderr)
+        if slower:
+            sys.exit(1)
+        print(f'no regressions against {args.baseline}', file=sys.stderr)
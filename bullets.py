@@ -0,0 +1,117 @@
+import numpy as np
+
+DIRECTIONS = {
+    'up': (0, -1),
+    'down': (0, 1),
+    'left': (-1, 0),
+    'right': (1, 0),
+}
+
+
+class Bullet:
+    '''
+    one slot in the bullet pool. px, py is where it was before
+    its last move
+    '''
+
+    __slots__ = ('x', 'y', 'px', 'py', 'w', 'h', 'dir', 'dx', 'dy')
+
+    def __init__(self):
+        self.x = 0
+        self.y = 0
+        self.px = 0
+        self.py = 0
+        self.w = 1
+        self.h = 1
+        self.dir = 'up'
+        self.dx = 0
+        self.dy = -1
+
+
+class BulletPool:
+    '''
+    fixed number of bullet records allocated up front. Firing takes
+    a record off the free list, and removing one swaps the last live
+    bullet into its place so nothing shifts around
+    '''
+
+    def __init__(self, capacity=64):
+        '''
+        capacity is the most bullets that can be in the air at once
+        '''
+
+        self.capacity = capacity
+        self.free = [Bullet() for _ in range(capacity)]
+        self.live = []
+
+    def __len__(self):
+        return len(self.live)
+
+    def __iter__(self):
+        return iter(self.live)
+
+    def __getitem__(self, index):
+        return self.live[index]
+
+    def spawn(self, x, y, direction):
+        '''
+        fire a bullet, returns None when the pool is used up
+        '''
+
+        if not self.free:
+            return None
+        bul = self.free.pop()
+        bul.x = bul.px = x
+        bul.y = bul.py = y
+        bul.dir = direction
+        bul.dx, bul.dy = DIRECTIONS[direction]
+        self.live.append(bul)
+        return bul
+
+    def remove_at(self, index):
+        '''
+        O(1) removal. The last live bullet moves into index, so when
+        removing while looping go from the end to the start
+        '''
+
+        live = self.live
+        bul = live[index]
+        last = live.pop()
+        if index < len(live):
+            live[index] = last
+        self.free.append(bul)
+
+    def clear(self):
+        self.free.extend(self.live)
+        self.live.clear()
+
+    def advance(self, speed, width, height):
+        '''
+        move every bullet and drop the ones that left the screen. A
+        bullet is only dropped once the start of its move is off
+        screen, so the last stretch still gets swept for hits
+        '''
+
+        live = self.live
+        for index in range(len(live) - 1, -1, -1):
+            bul = live[index]
+            bul.px = x = bul.x
+            bul.py = y = bul.y
+            if x < 0 or y < 0 or x > width or y > height:
+                self.remove_at(index)
+                continue
+            bul.x = x + bul.dx * speed
+            bul.y = y + bul.dy * speed
+
+    def paths(self):
+        '''
+        start and offset of every live bullet's last move as numpy
+        arrays x, y, dx, dy, in pool order
+        '''
+
+        live = self.live
+        x = np.array([bul.px for bul in live], dtype=np.float64)
+        y = np.array([bul.py for bul in live], dtype=np.float64)
+        dx = np.array([bul.x for bul in live], dtype=np.float64) - x
+        dy = np.array([bul.y for bul in live], dtype=np.float64) - y
+        return x, y, dx, dy
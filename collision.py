@@ -0,0 +1,156 @@
+import numpy as np
+
+
+def overlap_mask(x, y, w, h, xs, ys, ws, hs):
+    '''
+    tests one rect against numpy arrays of rects and returns a bool
+    array, true where they share at least one pixel. A rect covers x
+    through x + w - 1 like pyxel.rect does, so rects that only touch
+    edges don't overlap. Sizes are expected to be positive
+    '''
+
+    return (xs < x + w) & (x < xs + ws) & (ys < y + h) & (y < ys + hs)
+
+
+def sweep_times(x, y, dx, dy, w, h, xs, ys, ws, hs):
+    '''
+    swept version of overlap_mask. Boxes of w x h moving from x, y
+    by dx, dy are tested against rects element by element (anything
+    numpy can broadcast). Returns how far along the move, 0 to 1,
+    each one starts overlapping its rect, or inf if it never does.
+    Uses the same pixel coverage as overlap_mask
+    '''
+
+    enter_x, exit_x = slab(x, dx, xs - w, xs + ws)
+    enter_y, exit_y = slab(y, dy, ys - h, ys + hs)
+    enter = np.maximum(enter_x, enter_y)
+    leave = np.minimum(exit_x, exit_y)
+    hit = (enter < leave) & (enter < 1) & (leave > 0)
+    return np.where(hit, np.maximum(enter, 0.0), np.inf)
+
+
+def slab(pos, delta, lo, hi):
+    '''
+    when a point moving from pos by delta is strictly between lo and
+    hi on one axis, as enter and exit fractions of the move. Not
+    moving means always inside or never
+    '''
+
+    pos, delta, lo, hi = np.broadcast_arrays(pos, delta, lo, hi)
+    still = delta == 0
+    if not still.any():
+        t0 = (lo - pos) / delta
+        t1 = (hi - pos) / delta
+        return np.minimum(t0, t1), np.maximum(t0, t1)
+    moving = ~still
+    enter = np.where((lo < pos) & (pos < hi), -np.inf, np.inf)
+    leave = -enter
+    if moving.any():
+        d = delta[moving]
+        t0 = (lo[moving] - pos[moving]) / d
+        t1 = (hi[moving] - pos[moving]) / d
+        enter[moving] = np.minimum(t0, t1)
+        leave[moving] = np.maximum(t0, t1)
+    return enter, leave
+
+
+class SpatialHash:
+    '''
+    uniform grid broad phase for the stuff on screen. Each entry
+    is stored in every cell its rect touches so a query only has
+    to look at the cells around the rect being tested. Anything
+    off screen gets clamped into the edge cells
+    '''
+
+    def __init__(self, width, height, cell=20):
+        '''
+        size the grid to cover the screen
+        '''
+
+        self.cell = cell
+        self.cols = width // cell + 1
+        self.rows = height // cell + 1
+        self.cells = [set() for _ in range(self.cols * self.rows)]
+        self.spans = {}
+        self.span_table = None
+
+    def span(self, x, y, w, h):
+        '''
+        range of cells covered by the pixels of a rect
+        '''
+
+        cell = self.cell
+        cx0 = min(max(int(x) // cell, 0), self.cols - 1)
+        cy0 = min(max(int(y) // cell, 0), self.rows - 1)
+        cx1 = min(max(int(x + w - 1) // cell, 0), self.cols - 1)
+        cy1 = min(max(int(y + h - 1) // cell, 0), self.rows - 1)
+        return cx0, cy0, cx1, cy1
+
+    def clear(self):
+        for bucket in self.cells:
+            bucket.clear()
+        self.spans = {}
+        self.span_table = None
+
+    def move_all(self, xs, ys, ws, hs, alive):
+        '''
+        add or update every live entry of an EntityStore, keyed by
+        index. Spans are worked out for every entry at once and only
+        the ones that changed cells get re-bucketed
+        '''
+
+        cell = self.cell
+        spans = np.stack((
+            np.clip(xs // cell, 0, self.cols - 1),
+            np.clip(ys // cell, 0, self.rows - 1),
+            np.clip((xs + ws - 1) // cell, 0, self.cols - 1),
+            np.clip((ys + hs - 1) // cell, 0, self.rows - 1),
+        ), axis=1)
+        if self.span_table is None or len(self.span_table) != len(spans):
+            changed = alive
+        else:
+            changed = alive & (spans != self.span_table).any(axis=1)
+        self.span_table = spans
+        for key in np.flatnonzero(changed).tolist():
+            span = tuple(spans[key].tolist())
+            old = self.spans.get(key)
+            if old is not None:
+                self.discard(key, old)
+            self.spans[key] = span
+            self.add(key, span)
+
+    def remove(self, key):
+        old = self.spans.pop(key, None)
+        if old is not None:
+            self.discard(key, old)
+
+    def add(self, key, span):
+        cx0, cy0, cx1, cy1 = span
+        cols = self.cols
+        for cy in range(cy0, cy1 + 1):
+            for cx in range(cx0, cx1 + 1):
+                self.cells[cy * cols + cx].add(key)
+
+    def discard(self, key, span):
+        cx0, cy0, cx1, cy1 = span
+        cols = self.cols
+        for cy in range(cy0, cy1 + 1):
+            for cx in range(cx0, cx1 + 1):
+                self.cells[cy * cols + cx].discard(key)
+
+    def query(self, x, y, w, h):
+        '''
+        keys of everything sharing a cell with the rect, in
+        ascending order so results don't depend on set ordering
+        '''
+
+        cx0, cy0, cx1, cy1 = self.span(x, y, w, h)
+        cols = self.cols
+        if cx0 == cx1 and cy0 == cy1:
+            found = self.cells[cy0 * cols + cx0]
+        else:
+            found = set()
+            for cy in range(cy0, cy1 + 1):
+                for cx in range(cx0, cx1 + 1):
+                    found |= self.cells[cy * cols + cx]
+        return sorted(found)
@@ -0,0 +1,52 @@
+from backend import pyxel
+
+LEFT = 1
+RIGHT = 2
+UP = 4
+DOWN = 8
+FIRE = 16
+ENTER = 32
+QUIT = 64
+RESTART = 128
+REWIND = 256
+
+
+class Controls:
+    '''
+    the buttons the game reacts to, read once per frame into a
+    bitmask so a frame's input can be recorded and played back
+    '''
+
+    def __init__(self):
+        self.bits = 0
+
+    def poll(self):
+        '''
+        read the keyboard/gamepad. FIRE and RESTART are only set on
+        the frame space/A or R goes down, the rest are set while held
+        '''
+
+        bits = 0
+        if pyxel.btn(pyxel.KEY_LEFT) or pyxel.btn(pyxel.GAMEPAD1_BUTTON_DPAD_LEFT):
+            bits |= LEFT
+        if pyxel.btn(pyxel.KEY_RIGHT) or pyxel.btn(pyxel.GAMEPAD1_BUTTON_DPAD_RIGHT):
+            bits |= RIGHT
+        if pyxel.btn(pyxel.KEY_UP) or pyxel.btn(pyxel.GAMEPAD1_BUTTON_DPAD_UP):
+            bits |= UP
+        if pyxel.btn(pyxel.KEY_DOWN) or pyxel.btn(pyxel.GAMEPAD1_BUTTON_DPAD_DOWN):
+            bits |= DOWN
+        if pyxel.btnp(pyxel.KEY_SPACE) or pyxel.btnp(pyxel.GAMEPAD1_BUTTON_A):
+            bits |= FIRE
+        if pyxel.btn(pyxel.KEY_RETURN) or pyxel.btnp(pyxel.GAMEPAD1_BUTTON_B):
+            bits |= ENTER
+        if pyxel.btn(pyxel.KEY_Q):
+            bits |= QUIT
+        if pyxel.btnp(pyxel.KEY_R):
+            bits |= RESTART
+        if pyxel.btn(pyxel.KEY_BACKSPACE):
+            bits |= REWIND
+        self.bits = bits
+        return bits
+
+    def held(self, bit):
+        return self.bits & bit != 0
@@ -0,0 +1,164 @@
+import numpy as np
+
+from collision import overlap_mask, sweep_times
+
+
+class Entity:
+    '''
+    dict style view of one entry in an EntityStore so code written
+    against the level dicts keeps working, e.g.
+    stuff.items[2]['x'] += 5
+    '''
+
+    __slots__ = ('store', 'idx')
+
+    def __init__(self, store, idx):
+        self.store = store
+        self.idx = idx
+
+    def __getitem__(self, key):
+        if key not in EntityStore.KEYS:
+            raise KeyError(key)
+        store = self.store
+        if key == 'd':
+            return 'y' if store.vertical[self.idx] else 'x'
+        if key in ('t', 'msg', 'path', 'around'):
+            return getattr(store, key)[self.idx]
+        return int(getattr(store, key)[self.idx])
+
+    def __setitem__(self, key, value):
+        if key not in EntityStore.KEYS:
+            raise KeyError(key)
+        if key == 'd':
+            self.store.vertical[self.idx] = value == 'y'
+        else:
+            getattr(self.store, key)[self.idx] = value
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def keys(self):
+        return EntityStore.KEYS
+
+
+class EntityStore:
+    '''
+    struct of arrays copy of one level's item dicts. Positions,
+    sizes and colors live in numpy arrays so moving everything on
+    screen is a handful of vector operations per frame
+    '''
+
+    KEYS = ('d', 't', 'x', 'y', 'w', 'h', 'bg', 'msg', 'path', 'around')
+
+    def __init__(self, items):
+        '''
+        copy the level definition, the original dicts are
+        left untouched
+        '''
+
+        self.x = np.array([i['x'] for i in items], dtype=np.int32)
+        self.y = np.array([i['y'] for i in items], dtype=np.int32)
+        self.w = np.array([i['w'] for i in items], dtype=np.int32)
+        self.h = np.array([i['h'] for i in items], dtype=np.int32)
+        self.bg = np.array([i['bg'] for i in items], dtype=np.int32)
+        self.vertical = np.array([i['d'] == 'y' for i in items], dtype=bool)
+        self.alive = np.ones(len(items), dtype=bool)
+        self.on_path = np.array([i.get('path') is not None for i in items], dtype=bool)
+        self.t = [i['t'] for i in items]
+        self.msg = [i['msg'] for i in items]
+        self.path = [i.get('path') for i in items]
+        self.around = [i.get('around') for i in items]
+
+    def __len__(self):
+        return len(self.t)
+
+    def __getitem__(self, idx):
+        if not -len(self) <= idx < len(self):
+            raise IndexError(idx)
+        return Entity(self, idx % len(self))
+
+    def __iter__(self):
+        for idx in range(len(self)):
+            yield Entity(self, idx)
+
+    def move(self, speed, jitter, width, height, rng):
+        '''
+        advance every live item by speed along its direction. On
+        jitter frames items wobble +/- 1 across their direction,
+        and anything past the edge of the screen respawns at a
+        random spot on the opposite edge. Items on a path (see
+        paths.py) are left alone
+        '''
+
+        count = len(self)
+        if not count:
+            return
+        free = self.alive & ~self.on_path
+        horiz = free & ~self.vertical
+        vert = free & self.vertical
+        wrap_x = horiz & (self.x > width)
+        wrap_y = vert & (self.y > height)
+        step_x = horiz ^ wrap_x
+        step_y = vert ^ wrap_y
+
+        self.x += speed * step_x
+        self.y += speed * step_y
+        if jitter:
+            wobble = rng.integers(-1, 2, count, dtype=np.int32)
+            self.y += wobble * step_x
+            self.x += wobble * step_y
+
+        if wrap_x.any():
+            self.x[wrap_x] = 0
+            self.y[wrap_x] = rng.integers(0, height - 4, wrap_x.sum())
+        if wrap_y.any():
+            self.y[wrap_y] = 0
+            self.x[wrap_y] = rng.integers(0, width - 9, wrap_y.sum())
+
+    def overlapping(self, x, y, w, h, keys):
+        '''
+        keys (in order) of the live items overlapping the rect
+        '''
+
+        if not len(keys):
+            return []
+        keys = np.asarray(keys, dtype=np.intp)
+        mask = overlap_mask(x, y, w, h, self.x[keys], self.y[keys], self.w[keys], self.h[keys])
+        mask &= self.alive[keys]
+        return keys[mask].tolist()
+
+    def first_hits(self, x, y, dx, dy, w, h, owners, keys):
+        '''
+        swept test for a batch of moving w x h boxes (numpy arrays
+        x, y, dx, dy) against candidate items. Each (owners[i],
+        keys[i]) pair is one box/item to check. Returns a dict of box
+        index to the live item it reaches first, ties going to the
+        lower key
+        '''
+
+        if not len(keys):
+            return {}
+        owners = np.asarray(owners, dtype=np.intp)
+        keys = np.asarray(keys, dtype=np.intp)
+
+        # most pairs don't even share the box around the whole move
+        x0, y0 = np.minimum(x, x + dx), np.minimum(y, y + dy)
+        near = overlap_mask(x0[owners], y0[owners], np.abs(dx[owners]) + w, np.abs(dy[owners]) + h,
+                            self.x[keys], self.y[keys], self.w[keys], self.h[keys])
+        near &= self.alive[keys]
+        if not near.any():
+            return {}
+        owners, keys = owners[near], keys[near]
+
+        times = sweep_times(x[owners], y[owners], dx[owners], dy[owners], w, h,
+                            self.x[keys], self.y[keys], self.w[keys], self.h[keys])
+        hit = np.isfinite(times)
+        owners, keys, times = owners[hit], keys[hit], times[hit]
+        order = np.lexsort((keys, times, owners))
+        owners, keys = owners[order], keys[order]
+        first = np.ones(len(owners), dtype=bool)
+        first[1:] = owners[1:] != owners[:-1]
+        return dict(zip(owners[first].tolist(), keys[first].tolist()))
@@ -0,0 +1,204 @@
+'''
+pre-rendered (baked) version of the title font. Rasterizing a TTF is
+slow and the file is big, so the glyphs the game actually draws with
+it get rendered once by pyxel and stored as a small bitmap font:
+
+    python fonts.py assets/deja.ttf 14      writes assets/deja_14.fnt
+
+At runtime the .fnt is turned into a strip of glyph images per color
+and text is drawn with one blt per letter. The TTF is only loaded if
+there is no baked font, and the built in font is used if neither is
+around.
+
+File layout (little endian):
+
+    header   magic 'RRFT', version, line height, glyph count
+    glyphs   per glyph: code point, x/y offset from the pen, bitmap
+             width and height, advance
+    bits     each glyph's bitmap, one bit per pixel row by row,
+             padded to a whole byte
+'''
+
+import argparse
+import os
+import struct
+import sys
+
+from backend import pyxel
+from render import WORLD
+
+MAGIC = b'RRFT'
+VERSION = 1
+HEADER = struct.Struct('<4sBBH')
+GLYPH = struct.Struct('<HbbBBB')
+
+# strings main.py draws with the title font
+TITLE_TEXT = ('Jason Munro: The Game', 'GAME OVER')
+
+
+class Glyph:
+    '''
+    one baked letter. u is where it starts in the color strips
+    '''
+
+    __slots__ = ('ox', 'oy', 'w', 'h', 'advance', 'bits', 'u')
+
+    def __init__(self, ox, oy, w, h, advance, bits):
+        self.ox = ox
+        self.oy = oy
+        self.w = w
+        self.h = h
+        self.advance = advance
+        self.bits = bits
+        self.u = 0
+
+
+def bake(ttf, size, chars, pad=8):
+    '''
+    render each char with pyxel's TTF support and keep the pixels
+    that got set. Returns the line height and a dict of glyphs
+    '''
+
+    font = pyxel.Font(ttf, size)
+    cell = size * 2 + pad * 2
+    img = pyxel.Image(cell, cell)
+    glyphs = {}
+    height = 0
+    for ch in sorted(set(chars)):
+        img.cls(0)
+        img.text(pad, pad, ch, 1, font)
+        lit = [(x, y) for y in range(cell) for x in range(cell) if img.pget(x, y)]
+        advance = font.text_width(ch)
+        if not lit:
+            glyphs[ch] = Glyph(0, 0, 0, 0, advance, b'')
+            continue
+        x0 = min(x for x, _ in lit)
+        y0 = min(y for _, y in lit)
+        w = max(x for x, _ in lit) - x0 + 1
+        h = max(y for _, y in lit) - y0 + 1
+        bits = bytearray((w * h + 7) // 8)
+        for x, y in lit:
+            pos = (y - y0) * w + x - x0
+            bits[pos >> 3] |= 1 << (pos & 7)
+        glyphs[ch] = Glyph(x0 - pad, y0 - pad, w, h, advance, bytes(bits))
+        height = max(height, y0 - pad + h)
+    return height, glyphs
+
+
+def encode(height, glyphs):
+    out = [HEADER.pack(MAGIC, VERSION, height, len(glyphs))]
+    for ch, g in glyphs.items():
+        out.append(GLYPH.pack(ord(ch), g.ox, g.oy, g.w, g.h, g.advance))
+    out.extend(g.bits for g in glyphs.values())
+    return b''.join(out)
+
+
+def decode(data):
+    magic, version, height, count = HEADER.unpack_from(data, 0)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError('not a baked font')
+    pos = HEADER.size
+    specs = []
+    for _ in range(count):
+        specs.append(GLYPH.unpack_from(data, pos))
+        pos += GLYPH.size
+    glyphs = {}
+    for code, ox, oy, w, h, advance in specs:
+        size = (w * h + 7) // 8
+        glyphs[chr(code)] = Glyph(ox, oy, w, h, advance, data[pos:pos + size])
+        pos += size
+    return height, glyphs
+
+
+def baked_path(ttf, size):
+    return f'{os.path.splitext(ttf)[0]}_{size}.fnt'
+
+
+class BitmapFont:
+    '''
+    runtime side of a baked font. Glyphs are drawn into an off-screen
+    strip the first time a color is used, after that every letter is
+    a blt with color 0 as transparent
+    '''
+
+    def __init__(self, height, glyphs):
+        self.height = height
+        self.glyphs = glyphs
+        self.strips = {}
+        u = 0
+        for g in glyphs.values():
+            g.u = u
+            u += g.w
+        self.strip_w = max(u, 1)
+        self.strip_h = max([g.h for g in glyphs.values()] + [1])
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            return cls(*decode(f.read()))
+
+    def strip(self, col):
+        '''
+        image with every glyph drawn in col
+        '''
+
+        img = self.strips.get(col)
+        if img is None:
+            img = pyxel.Image(self.strip_w, self.strip_h)
+            img.cls(0)
+            for g in self.glyphs.values():
+                for pos in range(g.w * g.h):
+                    if g.bits[pos >> 3] >> (pos & 7) & 1:
+                        img.pset(g.u + pos % g.w, pos // g.w, col)
+            self.strips[col] = img
+        return img
+
+    def text_width(self, s):
+        return sum(self.glyphs[ch].advance for ch in s if ch in self.glyphs)
+
+    def draw(self, queue, x, y, s, col, layer=WORLD):
+        '''
+        queue s at x, y. Letters that weren't baked are skipped
+        '''
+
+        img = self.strip(col)
+        pen = x
+        for ch in s:
+            g = self.glyphs.get(ch)
+            if g is None:
+                continue
+            if g.w:
+                queue.blt(pen + g.ox, y + g.oy, img, g.u, 0, g.w, g.h, 0, layer=layer)
+            pen += g.advance
+
+
+def load_font(ttf, size):
+    '''
+    the baked version of ttf at size if it exists, otherwise the TTF
+    itself, otherwise None (the built in font)
+    '''
+
+    baked = baked_path(ttf, size)
+    if os.path.exists(baked):
+        return BitmapFont.load(baked)
+    if os.path.exists(ttf):
+        return pyxel.Font(ttf, size)
+    return None
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='bake a TTF into a bitmap font')
+    parser.add_argument('ttf')
+    parser.add_argument('size', type=int)
+    parser.add_argument('--text', action='append', help='strings to bake glyphs for (default: the title strings)')
+    parser.add_argument('-o', dest='output', help='output file (default: next to the TTF)')
+    args = parser.parse_args()
+
+    chars = ''.join(args.text or TITLE_TEXT)
+    height, glyphs = bake(args.ttf, args.size, chars)
+    data = encode(height, glyphs)
+    path = args.output or baked_path(args.ttf, args.size)
+    with open(path, 'wb') as f:
+        f.write(data)
+    print(f'{path}: {len(glyphs)} glyphs, {height}px high, {len(data)} bytes '
+          f'(ttf was {os.path.getsize(args.ttf)} bytes)', file=sys.stderr)
@@ -0,0 +1,66 @@
+from collections import OrderedDict
+
+from backend import pyxel
+
+
+class TextLayout:
+    '''
+    word wrapping for pyxel text. Results are remembered by
+    (text, width, font, indent) so showing the same message every
+    frame never measures anything again. Once more than size
+    layouts are stored the least recently used one goes
+    '''
+
+    def __init__(self, size=256):
+        self.size = size
+        self.layouts = OrderedDict()
+        self.measured = 0
+
+    def text_width(self, s, font=None):
+        '''
+        width in pixels, the built in font is FONT_WIDTH per letter
+        '''
+
+        if font is None:
+            return len(s) * pyxel.FONT_WIDTH
+        return font.text_width(s)
+
+    def wrap(self, text, width, font=None, indent=''):
+        '''
+        lines of text that each fit in width pixels, breaking at spaces
+        and at newlines. Lines after the first start with indent.
+        A word too long for a line on its own is split
+        '''
+
+        key = (text, width, font, indent)
+        lines = self.layouts.get(key)
+        if lines is not None:
+            self.layouts.move_to_end(key)
+            return lines
+        self.measured += 1
+        lines = []
+        for para in text.split('\n'):
+            line = ''
+            for word in para.split(' '):
+                joined = f'{line} {word}' if line.strip() else line + word
+                if self.text_width(joined, font) <= width:
+                    line = joined
+                    continue
+                if line.strip():
+                    lines.append(line)
+                    joined = indent + word
+                line = joined
+                # split words that can't fit on a line of their own
+                start = len(indent) + 1
+                while len(line) > start and self.text_width(line, font) > width:
+                    cut = len(line) - 1
+                    while cut > start and self.text_width(line[:cut], font) > width:
+                        cut -= 1
+                    lines.append(line[:cut])
+                    line = indent + line[cut:]
+            lines.append(line)
+        lines = tuple(lines)
+        self.layouts[key] = lines
+        if len(self.layouts) > self.size:
+            self.layouts.popitem(last=False)
+        return lines
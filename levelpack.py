@@ -0,0 +1,202 @@
+'''
+level packs. Levels are written as JSON:
+
+    {"levels": [[{"d": "x", "t": "J", "x": 10, "y": 20, "w": 10,
+                  "h": 10, "bg": 1, "msg": "...", "path": "sine"}, ...], ...]}
+
+"path" is optional, see paths.py for the names. A loop can also
+have "around": the msg of another item in the level, whose middle
+the loop then follows.
+
+and compiled into a binary .pak next to the JSON file. The .pak
+header has the sha256 of the JSON it came from, so the JSON is only
+parsed again when it changes. Levels are read out of the .pak one at
+a time as the game gets to them.
+
+run "python levelpack.py levels/resume.json" to build the .pak ahead
+of time
+'''
+
+import hashlib
+import json
+import os
+import struct
+import sys
+
+MAGIC = b'RRLP'
+VERSION = 3
+HEADER = struct.Struct('<4sHH32s')
+OFFSET = struct.Struct('<II')
+COUNT = struct.Struct('<H')
+ITEM = struct.Struct('<BhhHHB')
+TLEN = struct.Struct('<B')
+MLEN = struct.Struct('<H')
+PLEN = struct.Struct('<B')
+
+
+def encode_level(items):
+    '''
+    pack one level's list of item dicts
+    '''
+
+    parts = [COUNT.pack(len(items))]
+    for item in items:
+        t = item['t'].encode('utf-8')
+        msg = item['msg'].encode('utf-8')
+        path = (item.get('path') or '').encode('utf-8')
+        around = (item.get('around') or '').encode('utf-8')
+        parts.append(ITEM.pack(item['d'] == 'y', item['x'], item['y'], item['w'], item['h'], item['bg']))
+        parts.append(TLEN.pack(len(t)) + t)
+        parts.append(MLEN.pack(len(msg)) + msg)
+        parts.append(PLEN.pack(len(path)) + path)
+        parts.append(MLEN.pack(len(around)) + around)
+    return b''.join(parts)
+
+
+def decode_level(blob):
+    '''
+    unpack one level back into a list of item dicts
+    '''
+
+    items = []
+    (count,) = COUNT.unpack_from(blob, 0)
+    pos = COUNT.size
+    for _ in range(count):
+        vertical, x, y, w, h, bg = ITEM.unpack_from(blob, pos)
+        pos += ITEM.size
+        (size,) = TLEN.unpack_from(blob, pos)
+        pos += TLEN.size
+        t = blob[pos:pos + size].decode('utf-8')
+        pos += size
+        (size,) = MLEN.unpack_from(blob, pos)
+        pos += MLEN.size
+        msg = blob[pos:pos + size].decode('utf-8')
+        pos += size
+        (size,) = PLEN.unpack_from(blob, pos)
+        pos += PLEN.size
+        path = blob[pos:pos + size].decode('utf-8') or None
+        pos += size
+        (size,) = MLEN.unpack_from(blob, pos)
+        pos += MLEN.size
+        around = blob[pos:pos + size].decode('utf-8') or None
+        pos += size
+        items.append({'d': 'y' if vertical else 'x', 't': t, 'x': x, 'y': y, 'w': w, 'h': h, 'bg': bg,
+                      'msg': msg, 'path': path, 'around': around})
+    return items
+
+
+def compile_pack(levels, digest):
+    '''
+    build a .pak from a list of levels, digest is the hash of
+    the source JSON
+    '''
+
+    blobs = [encode_level(items) for items in levels]
+    table = []
+    offset = HEADER.size + OFFSET.size * len(blobs)
+    for blob in blobs:
+        table.append(OFFSET.pack(offset, len(blob)))
+        offset += len(blob)
+    header = HEADER.pack(MAGIC, VERSION, len(blobs), digest)
+    return header + b''.join(table) + b''.join(blobs)
+
+
+def read_index(data):
+    '''
+    digest and (offset, length) table from the start of a .pak,
+    None if it isn't one we can read
+    '''
+
+    if len(data) < HEADER.size:
+        return None
+    magic, version, count, digest = HEADER.unpack_from(data, 0)
+    if magic != MAGIC or version != VERSION:
+        return None
+    if len(data) < HEADER.size + OFFSET.size * count:
+        return None
+    table = [OFFSET.unpack_from(data, HEADER.size + OFFSET.size * idx) for idx in range(count)]
+    return digest, table
+
+
+class LevelPack:
+    '''
+    lazily loaded set of levels. Only the offset table stays in
+    memory, each level is read and decoded when load() asks for it
+    '''
+
+    def __init__(self, path):
+        '''
+        path is the JSON file. If it's missing the .pak is used
+        on its own
+        '''
+
+        self.path = path
+        self.pak_path = os.path.splitext(path)[0] + '.pak'
+        self.data = None
+        self.table = []
+        self.compiled = False
+        self.open()
+
+    def open(self):
+        '''
+        use the .pak if it was built from the current JSON, otherwise
+        compile it again
+        '''
+
+        digest = None
+        source = None
+        if os.path.exists(self.path):
+            with open(self.path, 'rb') as f:
+                source = f.read()
+            digest = hashlib.sha256(source).digest()
+
+        index = None
+        if os.path.exists(self.pak_path):
+            with open(self.pak_path, 'rb') as f:
+                head = f.read(HEADER.size)
+                if len(head) == HEADER.size:
+                    count = HEADER.unpack(head)[2]
+                    index = read_index(head + f.read(OFFSET.size * count))
+        if index and (digest is None or index[0] == digest):
+            self.table = index[1]
+            return
+        if source is None:
+            raise FileNotFoundError(self.path)
+
+        data = compile_pack(json.loads(source)['levels'], digest)
+        self.compiled = True
+        self.table = read_index(data)[1]
+        try:
+            with open(self.pak_path, 'wb') as f:
+                f.write(data)
+        except OSError:
+            # read only install, keep the compiled bytes around instead
+            self.data = data
+
+    def __len__(self):
+        return len(self.table)
+
+    def has_level(self, level):
+        return 1 <= level <= len(self.table)
+
+    def load(self, level):
+        '''
+        list of item dicts for a level, numbered from 1. Unknown
+        levels are empty
+        '''
+
+        if not self.has_level(level):
+            return []
+        offset, length = self.table[level - 1]
+        if self.data is not None:
+            return decode_level(self.data[offset:offset + length])
+        with open(self.pak_path, 'rb') as f:
+            f.seek(offset)
+            return decode_level(f.read(length))
+
+
+if __name__ == '__main__':
+    for name in sys.argv[1:]:
+        pack = LevelPack(name)
+        state = 'compiled' if pack.compiled else 'up to date'
+        print(f'{pack.pak_path}: {len(pack)} levels, {state}')
@@ -1,4 +1,54 @@
-import pyxel
+import argparse
+import atexit
+import os
+
+import numpy as np
+
+import controls
+from background import Background
+from backend import pyxel
+from bullets import BulletPool
+from collision import SpatialHash
+from controls import Controls
+from entities import EntityStore
+from fonts import load_font
+from layout import TextLayout
+from levelpack import LevelPack
+from panels import PanelCache
+from particles import ParticlePool
+from paths import PathTable
+from profiler import FrameProfiler
+from render import EFFECTS, UI, screen
+from replay import InputLog, state_checksum
+from scenes import Scene, SceneStack
+from snapshot import SnapshotRing, capture, restore
+from sprites import SpriteAtlas
+from timestep import FixedTimestep
+
+WIDTH = 200
+HEIGHT = 155
+FPS = 30
+MAX_SKIP = 4
+BULLET_SPEED = 5
+SNAP_EVERY = 10
+BG_ROTATE = False
+BG_SPEED = .01
+LEVEL_PACK = 'levels/resume.json'
+TITLE_FONT = 'assets/deja.ttf'
+PANEL_W = 180
+PANEL_MAX_H = HEIGHT - 20
+PANEL_TITLES = {
+    'S': 'Skill Unlocked!',
+    'J': 'Job History Unlocked!',
+    'F': 'Fun Fact Unlocked!',
+    'BOSS': 'FINAL Fact Unlocked!',
+}
+BOSS_TEXT = (
+    'Designing, building, and managing complex software is what I am best at.',
+    'This game is the result of a fun weekend project to learn pyxel. '
+    'The code is available at my github account',
+    'Thanks for playing!',
+)
 
 
 class TitleScreen:
@@ -10,14 +60,15 @@ class TitleScreen:
     def __init__(self):
         '''
         initialize some flags, a position counter,
-        load the title font, and define the text to
-        be printed
+        load the title font (baked if it has been, see
+        fonts.py), and define the text to be printed
         '''
 
         self.pos = 1
         self.line1 = False
         self.line2 = False
-        self.font = pyxel.Font("assets/deja.ttf", 14)
+        self.frames = 0
+        self.font = load_font(TITLE_FONT, 14)
         self.lines = [
             "Jason Munro: The Game",
             "Play on to learn about Jason's skills!",
@@ -27,20 +78,24 @@ class TitleScreen:
             "- Finish the game then hire that guy!"
         ]
     
-    def print_by_char(self, x, y, color, orig_string, font=None):
+    def tick(self):
         '''
-        print a line one letter at a time every 3 frames of the
-        event loop
+        type line 1 and then line 2 one letter every 3 ticks. A line
+        that was fully shown last tick is done and the next one starts
         '''
 
-        string = orig_string[0:self.pos]
-        if pyxel.frame_count > 3 and pyxel.frame_count % 3 == 0:
-            self.pos += 1
-        pyxel.text(x, y, string, color, font)
-        if len(string) == len(orig_string):
+        self.frames += 1
+        if self.line2:
+            return
+        line = self.lines[1] if self.line1 else self.lines[0]
+        if self.pos >= len(line):
             self.pos = 1
-            return True
-        return False
+            if self.line1:
+                self.line2 = True
+            else:
+                self.line1 = True
+        elif self.frames > 3 and self.frames % 3 == 0:
+            self.pos += 1
 
     def instructions(self):
         '''
@@ -49,33 +104,35 @@ class TitleScreen:
         every 30 frames
         '''
 
-        pyxel.text(25, 20, self.lines[0], 16, self.font)
-        pyxel.text(25, 50, self.lines[1], 10)
-        if pyxel.frame_count > 180:
-            pyxel.text(30, 75, self.lines[2], 3)
-        if pyxel.frame_count > 210:
-            pyxel.text(30, 85, self.lines[3], 3)
-        if pyxel.frame_count > 240:
-            pyxel.text(30, 95, self.lines[4], 3)
-        if pyxel.frame_count > 270:
-            pyxel.text(30, 105, self.lines[5], 4)
-        if pyxel.frame_count > 300:
+        frame = self.frames
+        screen.text(25, 20, self.lines[0], 16, self.font)
+        screen.text(25, 50, self.lines[1], 10)
+        if frame > 180:
+            screen.text(30, 75, self.lines[2], 3)
+        if frame > 210:
+            screen.text(30, 85, self.lines[3], 3)
+        if frame > 240:
+            screen.text(30, 95, self.lines[4], 3)
+        if frame > 270:
+            screen.text(30, 105, self.lines[5], 4)
+        if frame > 300:
             color = 16
-            if pyxel.frame_count % 50 in (0,1,2,3,4,5):
+            if frame % 50 in (0,1,2,3,4,5):
                 color = 0 
-            pyxel.text(45, 130, "Press the spacebar to start", color)
+            screen.text(45, 130, "Press the spacebar to start", color)
     
     def draw(self):
         '''
         entry point that does all the work, first prints line 1 and 2
-        one letter at a time, then prints the instructions
+        as far as tick() has typed them, then prints the instructions.
+        Only reads the state so it doesn't matter how often it's called
         '''
 
         if not self.line1:
-            self.line1 = self.print_by_char(25, 20, pyxel.frame_count % 16, self.lines[0], self.font)
-        elif self.line1 and not self.line2:
-            pyxel.text(25, 20, self.lines[0], 16, self.font)
-            self.line2 = self.print_by_char(25, 50, pyxel.frame_count % 16, self.lines[1])
+            screen.text(25, 20, self.lines[0][:self.pos], self.frames % 16, self.font)
+        elif not self.line2:
+            screen.text(25, 20, self.lines[0], 16, self.font)
+            screen.text(25, 50, self.lines[1][:self.pos], self.frames % 16)
         else:
             self.instructions()
 
@@ -86,187 +143,199 @@ class Player:
     around and stabbing/shooting stuff
     '''
 
-    def __init__(self, x, y, stuff):
+    def __init__(self, x, y, stuff, particles):
         '''
         variables to track the movement input, the current location,
         various states, the game level and the location of all the stuff
-        that can be stabbed/shot
+        that can be stabbed/shot. particles is where hits and deaths
+        send their sparks
         '''
 
         self.last_dir = 'up'
         self.stuff = stuff
+        self.particles = particles
         self.in_sound = None
         self.dead_count = 0
         self.is_idle = 0
         self.is_dead = False
         self.cant_die = 0
-        self.bullets = []
+        self.bullets = BulletPool()
+        self.move_dir = None
+        self.fire = False
         self.level = 1
         self.x = x
         self.y = y
         self.w = 10
         self.h = 10
 
-    def stab_start(self):
+        # draw every face into the sprite atlas up front
+        for face in ('up', 'down', 'left', 'right'):
+            for col in (3, 11):
+                self.stuff.atlas.pin((face, col), self.w, self.h, self.render_face, face, col)
+        self.stuff.atlas.pin(('dead', 8), self.w, self.h, self.render_face, 'dead', 8)
+
+    def stab_start(self, tick):
         '''
         play stab/shoot sound
         '''
 
         pyxel.play(1, 0)
-        return pyxel.frame_count
+        return tick
 
-    def stab_stop(self, start):
+    def stab_stop(self, start, tick):
         '''
         stop stab/shoot sound
         '''
 
-        if pyxel.frame_count > (start + 5):
+        if tick > (start + 5):
             pyxel.stop(1)
             self.in_sound = None
+
+    def poll(self, buttons):
+        '''
+        take the controls read for this drawn frame. Presses are held
+        onto until the next simulation tick uses them so a frame that
+        runs several ticks doesn't fire more than once
+        '''
+
+        if buttons.held(controls.LEFT):
+            self.move_dir = 'left'
+        elif buttons.held(controls.RIGHT):
+            self.move_dir = 'right'
+        elif buttons.held(controls.UP):
+            self.move_dir = 'up'
+        elif buttons.held(controls.DOWN):
+            self.move_dir = 'down'
+        else:
+            self.move_dir = None
+        if buttons.held(controls.FIRE):
+            self.fire = True
         
-    def update(self):
+    def update(self, tick):
         '''
-        check for key input and setup the new coordinates for the player
-        location, if the space key is active perform a stab/shot
+        one simulation tick. Move the player based on the polled input,
+        shoot if space was pressed, move bullets and check for hits
         '''
 
         if self.in_sound:
-            self.stab_stop(self.in_sound)
-        if pyxel.btn(pyxel.KEY_LEFT) or pyxel.btn(pyxel.GAMEPAD1_BUTTON_DPAD_LEFT):
+            self.stab_stop(self.in_sound, tick)
+        if self.move_dir == 'left':
             self.is_idle = 0
             self.x -= 2
             self.last_dir = 'left'
-        elif pyxel.btn(pyxel.KEY_RIGHT) or pyxel.btn(pyxel.GAMEPAD1_BUTTON_DPAD_RIGHT):
+        elif self.move_dir == 'right':
             self.is_idle = 0
             self.x += 2
             self.last_dir = 'right'
-        elif pyxel.btn(pyxel.KEY_UP) or pyxel.btn(pyxel.GAMEPAD1_BUTTON_DPAD_UP):
+        elif self.move_dir == 'up':
             self.is_idle = 0
             self.y -= 2
             self.last_dir = 'up'
-        elif pyxel.btn(pyxel.KEY_DOWN) or pyxel.btn(pyxel.GAMEPAD1_BUTTON_DPAD_DOWN):
+        elif self.move_dir == 'down':
             self.is_idle = 0
             self.y += 2
             self.last_dir = 'down'
         elif self.is_idle == 0:
-            self.is_idle = pyxel.frame_count
+            self.is_idle = tick
 
         self.x = max(self.x, 0)
         self.x = min(self.x, pyxel.width - self.w)
         self.y = max(self.y, 0)
         self.y = min(self.y, pyxel.height - self.h)
-        if pyxel.btnp(pyxel.KEY_SPACE) or pyxel.btnp(pyxel.GAMEPAD1_BUTTON_A):
+        if self.fire:
+            self.fire = False
             self.shoot()
-            self.in_sound = self.stab_start()
+            self.in_sound = self.stab_start(tick)
             # switched to shooting but keeping stab around for now
             #self.stab()
-            #self.in_sound = self.stab_start()
+            #self.in_sound = self.stab_start(tick)
         self.bullet_hit()
-        self.draw()
+
+        # check invincable status, then for collision
+        if self.cant_die > 0 and (tick - self.cant_die) < 50:
+            pass
+        else:
+            self.cant_die = 0
+            if not self.is_dead:
+                self.player_hit({'x': self.x, 'y': self.y, 'w': self.w, 'h': self.h})
+
+        # move bullets
+        if len(self.bullets) > 0:
+            self.move_bullets()
 
     def bullet_hit(self):
         '''
-        see if a bullet hit stuff
+        see if a bullet hit stuff anywhere along its last move, so
+        fast bullets can't skip over thin stuff
         '''
 
-        to_remove = None
-        for index, bul in enumerate(self.bullets):
-            for idx, vals in enumerate(self.stuff.stuff_map[self.level]):
-                if idx in self.stuff.found:
-                    continue
-                if self.rect_instersect(bul, vals):
-                    self.stuff.msg(vals['msg'], vals['t'])
-                    self.stuff.found.append(idx)
-                    to_remove = index
-                    break
-        if to_remove is not None:
-            del(self.bullets[to_remove])
+        items = self.stuff.items
+        grid = self.stuff.grid
+        bullets = self.bullets
+        if not len(bullets):
+            return
+        owners = []
+        keys = []
+        for index, bul in enumerate(bullets):
+            x, y = min(bul.x, bul.px), min(bul.y, bul.py)
+            w, h = abs(bul.x - bul.px) + bul.w, abs(bul.y - bul.py) + bul.h
+            found = grid.query(x, y, w, h)
+            owners.extend([index] * len(found))
+            keys.extend(found)
+        if not keys:
+            return
+        hits = items.first_hits(*bullets.paths(), 1, 1, owners, keys)
+
+        # last to first since remove_at swaps the last bullet in
+        for index in sorted(hits, reverse=True):
+            key = hits[index]
+            if not items.alive[key]:
+                continue
+            self.particles.burst(items.x[key] + items.w[key] / 2, items.y[key] + items.h[key] / 2,
+                                 24 + int(items.w[key] * items.h[key]) // 10, 2.0, 24,
+                                 (int(items.bg[key]), 7, 10))
+            self.stuff.show(items.msg[key], items.t[key])
+            self.stuff.mark_found(key)
+            bullets.remove_at(index)
 
     def player_hit(self, rect):
         '''
         see if they player hit stuff
         '''
 
-        for idx, vals in enumerate(self.stuff.stuff_map[self.level]):
-            if idx in self.stuff.found:
-                continue
-            if self.rect_instersect(rect, vals):
-                self.is_dead = True
-                self.dead_count += 1
-                break
+        x, y, w, h = rect['x'], rect['y'], rect['w'], rect['h']
+        if self.stuff.items.overlapping(x, y, w, h, self.stuff.grid.query(x, y, w, h)):
+            self.is_dead = True
+            self.dead_count += 1
+            self.particles.burst(x + w / 2, y + h / 2, 48, 2.5, 30, (8, 9, 10))
+            self.stuff.show('OUCH!', 'D')
 
     def stab_hit(self, rect):
         '''
         see if a stab hit stuff
         '''
 
-        for idx, vals in enumerate(self.stuff.stuff_map[self.level]):
-            if idx in self.stuff.found:
-                continue
-            if self.rect_instersect(rect, vals):
-                self.stuff.msg(vals['msg'], vals['t'])
-                self.stuff.found.append(idx)
-                break
+        x, y, w, h = rect['x'], rect['y'], rect['w'], rect['h']
+        items = self.stuff.items
+        hits = items.overlapping(x, y, w, h, self.stuff.grid.query(x, y, w, h))
+        if hits:
+            self.stuff.show(items.msg[hits[0]], items.t[hits[0]])
+            self.stuff.mark_found(hits[0])
     
-    def rect_instersect(self, rect1, rect2):
-        '''
-        using x, y, width, and height determine if 2
-        rectangles overlap in the game screen
-        '''
-
-        # top left of rect1 contained in rect2
-        if rect1['x'] >= rect2['x'] and \
-            rect1['x'] <= (rect2['x'] + rect2['w']) and \
-            rect1['y'] >= rect2['y'] and \
-            rect1['y'] <= (rect2['y'] + rect2['h']):
-            return True
-
-        # bottom right of rect1 contained in rect2
-        if (rect1['x'] + rect1['w']) >= rect2['x'] and \
-            (rect1['x'] + rect1['w']) <= (rect2['x'] + rect2['w']) and \
-            (rect1['y'] + rect1['h']) >= rect2['y'] and \
-            (rect1['y'] + rect1['h']) <= (rect2['y'] + rect2['h']):
-            return True
-
-        # top right of rect1 contained in rect2
-        if (rect1['x'] + rect1['w']) >= rect2['x'] and \
-            (rect1['x'] + rect1['w']) <= (rect2['x'] + rect2['w']) and \
-            rect1['y'] >= rect2['y'] and \
-            rect1['y'] <= (rect2['y'] + rect2['h']):
-            return True
-
-        # bottom left of rect1 contained in rect2
-        if rect1['x'] >= rect2['x'] and \
-            rect1['x'] <= (rect2['x'] + rect2['w']) and \
-            (rect1['y'] + rect1['h']) >= rect2['y'] and \
-            (rect1['y'] + rect1['h']) <= (rect2['y'] + rect2['h']):
-            return True
-        return False
-
     def shoot(self):
         '''
         render a bullet shot
         '''
 
-        rect = {'w': 1, 'h': 1}
         if self.last_dir == 'up':
-            rect['x'] = self.x + 4
-            rect['y'] = self.y - 1
-            rect['dir'] = 'up'
+            x, y = self.x + 4, self.y - 1
         elif self.last_dir == 'down':
-            rect['x'] = self.x + 4
-            rect['y'] = self.y + self.w
-            rect['dir'] = 'down'
+            x, y = self.x + 4, self.y + self.w
         elif self.last_dir == 'left':
-            rect['x'] = self.x - 1
-            rect['y'] = self.y + 4
-            rect['dir'] = 'left'
-        elif self.last_dir == 'right':
-            rect['x'] = self.x + self.w
-            rect['y'] = self.y + 4
-            rect['dir'] = 'right'
-        pyxel.pset(rect['x'], rect['y'], 7)
-        self.bullets.append(rect)
+            x, y = self.x - 1, self.y + 4
+        else:
+            x, y = self.x + self.w, self.y + 4
+        self.bullets.spawn(x, y, self.last_dir)
     
     def stab(self):
         '''
@@ -296,8 +365,8 @@ class Player:
             rect['w'] = 6
             rect['h'] = 2
         self.stab_hit(rect)
-        pyxel.rect(rect['x'], rect['y'], rect['w'], rect['h'], 7)
-        pyxel.rect(rect['x'], rect['y'], (rect['w'] - 1), (rect['h'] - 1), 13)
+        screen.rect(rect['x'], rect['y'], rect['w'], rect['h'], 7)
+        screen.rect(rect['x'], rect['y'], (rect['w'] - 1), (rect['h'] - 1), 13)
 
     def draw(self):
         '''
@@ -309,49 +378,41 @@ class Player:
         # dying)
         if self.cant_die and pyxel.frame_count % 15 in (0,1,2):
                 col = 11
+        face = self.last_dir
         if self.is_dead:
-            pyxel.rect(self.x, self.y, self.w, self.h, 8)
-            pyxel.rect((self.x + 2), (self.y + 1), 2, 2, 0)
-            pyxel.rect((self.x + 6), (self.y + 1), 2, 2, 0)
-            pyxel.elli((self.x + 2), (self.y + 4), 6, 5, 0)
-            self.stuff.msg('OUCH!', 'D')
+            face = 'dead'
+            col = 8
 
         # draw player at possibly updated location
-        elif self.last_dir == 'up':
-            pyxel.rect(self.x, self.y, self.w, self.h, col)
-            pyxel.rect((self.x + 2), (self.y + 1), 2, 2, 0)
-            pyxel.rect((self.x + 6), (self.y + 1), 2, 2, 0)
-            pyxel.rect((self.x + 2), (self.y + 6), 6, 1, 0)
-        elif self.last_dir == 'down':
-            pyxel.rect(self.x, self.y, self.w, self.h, col)
-            pyxel.rect((self.x + 2), (self.y + 3), 2, 2, 0)
-            pyxel.rect((self.x + 6), (self.y + 3), 2, 2, 0)
-            pyxel.rect((self.x + 2), (self.y + 6), 6, 1, 0)
-        elif self.last_dir == 'left':
-            pyxel.rect(self.x, self.y, self.w, self.h, col)
-            pyxel.rect((self.x + 1), (self.y + 1), 2, 2, 0)
-            pyxel.rect((self.x + 5), (self.y + 1), 2, 2, 0)
-            pyxel.rect((self.x + 2), (self.y + 6), 6, 1, 0)
-        elif self.last_dir == 'right':
-            pyxel.rect(self.x, self.y, self.w, self.h, col)
-            pyxel.rect((self.x + 3), (self.y + 1), 2, 2, 0)
-            pyxel.rect((self.x + 7), (self.y + 1), 2, 2, 0)
-            pyxel.rect((self.x + 2), (self.y + 6), 6, 1, 0)
-
-        # check invincable status
-        if self.cant_die > 0 and (pyxel.frame_count - self.cant_die) < 50:
-            self.move_bullets()
-            return
-        else:
-            self.cant_die = 0
+        self.stuff.atlas.blt(self.x, self.y, (face, col), self.w, self.h, self.render_face, face, col)
+        for bul in self.bullets:
+            screen.pset(bul.x, bul.y, 7, layer=EFFECTS)
 
-        # check for collision
-        if not self.is_dead:
-            self.player_hit({'x': self.x, 'y': self.y, 'w': self.w, 'h': self.h})
+    def render_face(self, img, u, v, face, col):
+        '''
+        draw one of the player faces into img at u, v. Only called
+        when building the sprite atlas
+        '''
 
-        # move bullets
-        if len(self.bullets) > 0:
-            self.move_bullets()
+        img.rect(u, v, self.w, self.h, col)
+        if face == 'dead':
+            img.rect((u + 2), (v + 1), 2, 2, 0)
+            img.rect((u + 6), (v + 1), 2, 2, 0)
+            img.elli((u + 2), (v + 4), 6, 5, 0)
+            return
+        if face == 'up':
+            img.rect((u + 2), (v + 1), 2, 2, 0)
+            img.rect((u + 6), (v + 1), 2, 2, 0)
+        elif face == 'down':
+            img.rect((u + 2), (v + 3), 2, 2, 0)
+            img.rect((u + 6), (v + 3), 2, 2, 0)
+        elif face == 'left':
+            img.rect((u + 1), (v + 1), 2, 2, 0)
+            img.rect((u + 5), (v + 1), 2, 2, 0)
+        elif face == 'right':
+            img.rect((u + 3), (v + 1), 2, 2, 0)
+            img.rect((u + 7), (v + 1), 2, 2, 0)
+        img.rect((u + 2), (v + 6), 6, 1, 0)
 
     def move_bullets(self):
         '''
@@ -359,23 +420,7 @@ class Player:
         the path
         '''
 
-        to_remove = []
-        for idx, bul in enumerate(self.bullets):
-            if bul['dir'] == 'up':
-                bul['y'] -= 5
-            elif bul['dir'] == 'down':
-                bul['y'] += 5
-            elif bul['dir'] == 'left':
-                bul['x'] -= 5
-            elif bul['dir'] == 'right':
-                bul['x'] += 5
-            if bul['x'] < 0 or bul['y'] < 0 or bul['x'] > pyxel.width or bul['y'] > pyxel.height:
-                to_remove.append(idx)
-            else:
-                pyxel.pset(bul['x'], bul['y'], 7)
-        for index in to_remove:
-            if len(self.bullets) > index:
-                del(self.bullets[index])
+        self.bullets.advance(BULLET_SPEED, pyxel.width, pyxel.height)
 
 
 class Stuff:
@@ -383,125 +428,354 @@ class Stuff:
     manage stuff that can be stabbed/shot
     '''
 
-    def __init__(self):
+    def __init__(self, pack=LEVEL_PACK, seed=None):
         '''
-        setup variables we need to track the state of stuff, and define what stuff
-        shows up on what level
+        setup variables we need to track the state of stuff. What stuff
+        shows up on what level comes from the level pack file. seed is
+        for the random wobble and respawn positions
         '''
 
         self.stuff_exists = True
         self.current_mtype = None
         self.current_msg = None
-        self.in_sound = False
         self.level = 1
-        self.found = []
-        self.stuff_map = {
-            1: [
-                {'d': 'y', 't': 'J', 'x': 100, 'y': 100, 'w': 10, 'h': 10, 'bg': 1, 'msg': 'Wrote code to run Stock Exchanges'},
-                {'d': 'x', 't': 'J', 'x': 100, 'y': 100, 'w': 10, 'h': 10, 'bg': 1, 'msg': 'Ran my own software company'},
-                {'d': 'x', 't': 'S', 'x': 30, 'y': 30, 'w': 10, 'h': 10, 'bg': 4, 'msg': 'Python expert 15+ years'},
-                {'d': 'x', 't': 'S', 'x': 60, 'y': 120, 'w': 10, 'h': 10, 'bg': 4, 'msg': 'PHP expert 20+ years'},
-                {'d': 'y', 't': 'F', 'x': 150, 'y': 10, 'w': 10, 'h': 10, 'bg': 2, 'msg': 'Big fan of retro gaming'},
-                {'d': 'x', 't': 'F', 'x': 90, 'y': 40, 'w': 10, 'h': 10, 'bg': 2, 'msg': "I love dogs!"},
-            ],
-            2: [
-                {'d': 'x', 't': 'J', 'x': 10, 'y': 60, 'w': 10, 'h': 10, 'bg': 1, 'msg': '6 years building algo trading systems'},
-                {'d': 'x', 't': 'J', 'x': 50, 'y': 80, 'w': 10, 'h': 10, 'bg': 1, 'msg': 'Solved hard mapping problems in ag-tech'},
-                {'d': 'y', 't': 'S', 'x': 190, 'y': 90, 'w': 10, 'h': 10, 'bg': 2, 'msg': 'Expert on E-mail protocols'},
-                {'d': 'y', 't': 'S', 'x': 110, 'y': 50, 'w': 10, 'h': 10, 'bg': 2, 'msg': 'Full stack experience in multiple jobs'},
-                {'d': 'y', 't': 'F', 'x': 90, 'y': 30, 'w': 10, 'h': 10, 'bg': 2, 'msg': 'I blog at unencumberedbyfacts.com'},
-                {'d': 'y', 't': 'F', 'x': 20, 'y': 10, 'w': 10, 'h': 10, 'bg': 2, 'msg': 'I code everything in vim, including this'},
-            ],
-            3: [
-                {'d': 'x', 't': 'J', 'x': 80, 'y': 0, 'w': 10, 'h': 10, 'bg': 4, 'msg': 'Coded billing systems for WordPress.com'},
-                {'d': 'x', 't': 'J', 'x': 140, 'y': 50, 'w': 10, 'h': 10, 'bg': 4, 'msg': 'Experienced with cloud based envs'},
-                {'d': 'y', 't': 'S', 'x': 65, 'y': 20, 'w': 10, 'h': 10, 'bg': 4, 'msg': 'Worked with all kinds of APIs'},
-                {'d': 'y', 't': 'S', 'x': 5, 'y': 90, 'w': 10, 'h': 10, 'bg': 4, 'msg': 'Experienced leading a team'},
-                {'d': 'x', 't': 'F', 'x': 160, 'y': 10, 'w': 10, 'h': 10, 'bg': 2, 'msg': 'Hitch-hiked the US in 1990 at age 19'},
-                {'d': 'y', 't': 'F', 'x': 120, 'y': 60, 'w': 10, 'h': 10, 'bg': 2, 'msg': 'Built a custom Linux distro'},
-            ],
-            4: [
-                {'d': 'x', 't': 'F', 'x': 10, 'y': 30, 'w': 60, 'h': 60, 'bg': 4, 'msg': 'BOSS'},
-            ]
-        }
+        self.found = set()
+        self.rng = np.random.default_rng(seed)
+        self.grid = SpatialHash(WIDTH, HEIGHT)
+        self.panels = PanelCache()
+        self.layout = TextLayout()
+        self.atlas = SpriteAtlas()
+        self.pack = LevelPack(pack)
+        self.load_level()
+
+    def load_level(self):
+        '''
+        read the current level out of the pack into an EntityStore
+        (self.items) and fill the collision grid with it. Only this
+        level is kept in memory
+        '''
+
+        self.set_items(self.pack.load(self.level))
+
+    def set_items(self, items):
+        '''
+        replace the stuff on screen with a list of item dicts
+        '''
+
+        self.found = set()
+        self.items = EntityStore(items)
+        self.paths = PathTable(self.items, self.level, WIDTH, HEIGHT)
+        self.grid.clear()
+        self.grid.move_all(self.items.x, self.items.y, self.items.w, self.items.h, self.items.alive)
+
+        # every tile the level needs goes in the atlas now. If they
+        # don't fit it's wiped here, between frames, never mid draw
+        keys = dict.fromkeys((vals['t'], vals['bg'], vals['w'], vals['h']) for vals in self.items)
+        new = [self.tile_size(*key[2:]) for key in keys if key not in self.atlas.tiles]
+        if not self.atlas.fits(new):
+            self.atlas.reset()
+        for key in keys:
+            self.item_tile(*key)
+
+    def tile_size(self, w, h):
+        '''
+        atlas room for a w x h piece of stuff. The tile is padded
+        so the letter never spills into a neighbor
+        '''
+
+        return max(w, 7), max(h, 8)
+
+    def item_tile(self, t, bg, w, h):
+        '''
+        atlas position of the tile for a piece of stuff
+        '''
+
+        return self.atlas.tile((t, bg, w, h), *self.tile_size(w, h), self.render_item, t, bg, w, h)
+
+    def render_item(self, img, u, v, t, bg, w, h):
+        '''
+        draw a piece of stuff into img at u, v for the atlas
+        '''
+
+        img.rect(u, v, w, h, bg)
+        img.rectb(u, v, w, h, 13)
+        img.text((u + 3), (v + 2), t, 16)
+
+    def mark_found(self, idx):
+        '''
+        stuff that has been shot is done for this level, drop it
+        from the collision grid
+        '''
+
+        self.found.add(idx)
+        self.items.alive[idx] = False
+        self.grid.remove(idx)
+
+    def next_level(self):
+        '''
+        reset what was found and move on to the next level
+        '''
+
+        self.level += 1
+        self.load_level()
     
-    def msg(self, msg, mtype):
+    def show(self, msg, mtype):
         '''
-        after a successful stab/shot, show a message window with the
+        after a successful stab/shot, open a message window with the
         info associated with that specific stuff. Also used for the
         "ouch" display
         '''
 
-        if not self.in_sound:
-            self.in_sound = True
-            if mtype == 'D':
-                pyxel.play(2, 2)
-            else:
-                pyxel.play(2, 1)
+        if mtype == 'D':
+            pyxel.play(2, 2)
+        else:
+            pyxel.play(2, 1)
         self.current_mtype = mtype
         self.current_msg = msg
 
-        # final multi-line message
+    def msg(self, msg, mtype):
+        '''
+        draw the message window
+        '''
+
+        x, y, w, h = self.panel_rect(msg, mtype)
+        self.panels.draw((msg, mtype), x, y, w, h, self.render_panel, msg, mtype)
+
+    def panel_lines(self, msg):
+        '''
+        wrapped text of a message window as (y, line) pairs, y is
+        relative to the window. Wrapping is remembered by self.layout
+        so this is cheap to call every frame
+        '''
+
         if msg == 'BOSS':
-            pyxel.rectb(10, 10, 180, 120, 11)
-            pyxel.rect(11, 11, 178, 118, 0)
-            pyxel.text(15, 15, "FINAL Fact Unlocked!", 10)
-            pyxel.text(15, 35, "Designing, building, and managing complex", 13)
-            pyxel.text(15, 45, "software is what I am best at.", 13)
-            pyxel.text(15, 60, "This game is the result of a fun weekend", 13)
-            pyxel.text(15, 70, "project to learn pyxel. The code is", 13)
-            pyxel.text(15, 80, "available at my github account", 13)
-            pyxel.text(15, 95, "Thanks for playing!", 13)
-            pyxel.text(60, 120, '"Enter" to continue', 1)
-
-        # regular messages
-        elif mtype in ('S', 'J', 'F'):
-            pyxel.rectb(10, 10, 180, 60, 11)
-            pyxel.rect(11, 11, 178, 58, 0)
-            if mtype == 'S':
-                pyxel.text(15, 15, "Skill Unlocked!", 10)
-            elif mtype == 'J':
-                pyxel.text(15, 15, "Job History Unlocked!", 10)
-            elif mtype == 'F':
-                pyxel.text(15, 15, "Fun Fact Unlocked!", 10)
-            pyxel.text(15, 35, f'- {msg}', 13)
-            pyxel.text(60, 60, '"Enter" to continue', 1)
+            paras, indent = BOSS_TEXT, ''
+        else:
+            paras, indent = (f'- {msg}',), '  '
+        lines = []
+        y = 25
+        for para in paras:
+            for line in self.layout.wrap(para, PANEL_W - 10, indent=indent):
+                # leave room for "Enter" to continue
+                if y + 35 > PANEL_MAX_H:
+                    return lines
+                lines.append((y, line))
+                y += 10
+            y += 5
+        return lines
+
+    def panel_rect(self, msg, mtype):
+        '''
+        screen position and size of the message window, tall
+        enough for the wrapped message
+        '''
+
+        if msg == 'BOSS' or mtype in PANEL_TITLES:
+            return 10, 10, PANEL_W, self.panel_lines(msg)[-1][0] + 35
+        return 20, 10, 160, 40
+
+    def render_panel(self, img, msg, mtype):
+        '''
+        draw a message window into img, coordinates are relative to
+        the top left of the window. Only called when the panel isn't
+        in the cache yet
+        '''
+
+        w, h = img.width, img.height
+
+        # skill, job, fun fact and the final message
+        if msg == 'BOSS' or mtype in PANEL_TITLES:
+            img.rectb(0, 0, w, h, 11)
+            img.rect(1, 1, w - 2, h - 2, 0)
+            img.text(5, 5, PANEL_TITLES['BOSS' if msg == 'BOSS' else mtype], 10)
+            for y, line in self.panel_lines(msg):
+                img.text(5, y, line, 13)
+            img.text(50, h - 10, '"Enter" to continue', 1)
 
         # Ouch!
         else:
-            pyxel.rectb(20, 10, 160, 40, 4)
-            pyxel.rect(21, 11, 158, 38, 0)
-            pyxel.text(90, 20, msg, 8)
-            pyxel.text(60, 40, '"Enter" to continue', 1)
+            img.rectb(0, 0, w, h, 4)
+            img.rect(1, 1, w - 2, h - 2, 0)
+            img.text(70, 10, msg, 8)
+            img.text(40, 30, '"Enter" to continue', 1)
     
-    def update(self):
+    def update(self, tick):
         '''
-        update the location and render any remaining stuff. 
-        The movement speed increases based on the level
+        update the location of any remaining stuff.
+        The movement speed increases based on the level,
+        stuff on a path steps along its precomputed table
         '''
 
-        for idx, vals in enumerate(self.stuff_map[self.level]):
-            if idx in self.found:
-                continue
-            if vals['d'] == 'x':
-                if vals['x'] > pyxel.width:
-                    vals['x'] = 0
-                    vals['y'] = pyxel.rndi(0, 150)
-                else:
-                    vals['x'] += self.level
-                    if pyxel.frame_count % 5 == 0:
-                        vals['y'] += pyxel.rndi(-1, 1)
-            else:
-                if vals['y'] > pyxel.height:
-                    vals['y'] = 0
-                    vals['x'] = pyxel.rndi(0, 190)
-                else:
-                    vals['y'] += self.level
-                    if pyxel.frame_count % 5 == 0:
-                        vals['x'] += pyxel.rndi(-1, 1)
-            pyxel.rect(vals['x'], vals['y'], vals['w'], vals['h'], vals['bg'])
-            pyxel.rectb(vals['x'], vals['y'], vals['w'], vals['h'], 13)
-            pyxel.text((vals['x'] + 3), (vals['y'] + 2), vals['t'], 16)
+        items = self.items
+        items.move(self.level, tick % 5 == 0, pyxel.width, pyxel.height, self.rng)
+        self.paths.advance(items)
+        self.grid.move_all(items.x, items.y, items.w, items.h, items.alive)
+
+    def draw(self):
+        '''
+        render any remaining stuff
+        '''
+
+        items = self.items
+        xs = items.x.tolist()
+        ys = items.y.tolist()
+        ws = items.w.tolist()
+        hs = items.h.tolist()
+        bgs = items.bg.tolist()
+        image = self.atlas.image
+        for idx in np.flatnonzero(items.alive).tolist():
+            u, v = self.item_tile(items.t[idx], bgs[idx], ws[idx], hs[idx])
+            screen.blt(xs[idx], ys[idx], image, u, v, ws[idx], hs[idx])
+
+
+class TitleScene(Scene):
+    '''
+    the title screen. The TitleScreen and its font only exist
+    while this scene is on the stack
+    '''
+
+    name = 'title'
+
+    def enter(self):
+        self.game.title_screen = TitleScreen()
+
+    def exit(self):
+        self.game.title_screen = None
+
+    def input(self, buttons):
+        # space to leave title screen
+        if buttons.held(controls.FIRE):
+            self.game.scenes.push(TransitionScene(self.game))
+
+    def tick(self):
+        self.game.title_screen.tick()
+
+    def draw(self):
+        self.game.title_screen.draw()
+
+
+class TransitionScene(Scene):
+    '''
+    the circle that grows between the title and the levels. It
+    plays over the title screen but hides the level underneath
+    '''
+
+    name = 'trans'
+
+    def enter(self):
+        # the title keeps going underneath, a level is paused
+        self.opaque = self.pauses = not self.game.scenes.has('title')
+
+    def tick(self):
+        self.game.transition()
+
+    def draw(self):
+        self.game.draw_transition()
+        self.game.particles.draw(UI)
+
+
+class PlayScene(Scene):
+    '''
+    a level being played
+    '''
+
+    name = 'play'
+
+    def input(self, buttons):
+        self.game.player.poll(buttons)
+
+    def tick(self):
+        game = self.game
+        stuff = game.stuff
+        if game.ticks % SNAP_EVERY == 0:
+            game.snapshots.push(capture(game))
+        game.player.update(game.ticks)
+        stuff.update(game.ticks)
+        game.particles.tick()
+        if game.rotate_bg:
+            game.bg_deg = (game.bg_deg + BG_SPEED) % 360
+
+        # start new level
+        if stuff.pack.has_level(game.level) and len(stuff.found) == len(stuff.items):
+            game.trans_r = 0
+            game.level += 1
+            game.player.level += 1
+            stuff.next_level()
+            game.scenes.push(TransitionScene(game))
+
+        # a hit or a death opens a message box, which pauses everything
+        if stuff.current_msg:
+            game.scenes.push(MessageScene(game))
+
+    def draw(self):
+        if self.game.rotate_bg:
+            self.game.background.draw(0, 0, self.game.bg_deg)
+        self.game.player.draw()
+        self.game.stuff.draw()
+        self.game.particles.draw()
+
+
+class MessageScene(Scene):
+    '''
+    a message window over the game, enter closes it
+    '''
+
+    name = 'msg'
+
+    def input(self, buttons):
+        # enter to continue from message screen
+        if not buttons.held(controls.ENTER):
+            return
+        game = self.game
+        if game.stuff.current_mtype == 'D':
+            game.player.cant_die = game.ticks
+        game.player.is_dead = False
+        game.stuff.current_mtype = None
+        game.stuff.current_msg = None
+        game.scenes.pop()
+        # the scene underneath gets this frame's input
+        game.scenes.input(buttons)
+
+    def draw(self):
+        stuff = self.game.stuff
+        if self.game.rotate_bg:
+            self.game.background.draw(0, 0, self.game.bg_deg, scale=1.5)
+        stuff.msg(stuff.current_msg, stuff.current_mtype)
+
+
+class EndScene(Scene):
+    '''
+    game over screen, scrolls in then waits for space (see
+    Game.jump). Loads the title font again for "GAME OVER"
+    '''
+
+    name = 'end'
+
+    def enter(self):
+        self.font = load_font(TITLE_FONT, 14)
+
+    def exit(self):
+        self.font = None
+
+    def tick(self):
+        if self.game.end_y < 50:
+            self.game.end_y += 1
+
+    def draw(self):
+        game = self.game
+        end_y = game.end_y
+        dead_count = game.player.dead_count
+        screen.text(60, end_y, 'GAME OVER', 4, self.font)
+        screen.text(85, end_y + 30, 'You Won!', 4)
+        if dead_count == 1:
+            screen.text(55, end_y + 40, f'(but you died {dead_count} time)', 9)
+        elif dead_count > 1:
+            screen.text(55, end_y + 40, f'(but you died {dead_count} times)', 9)
+        if end_y >= 50:
+            screen.text(45, 100, 'Press spacebar to play again', 1)
+
+
+SCENES = {scene.name: scene for scene in (TitleScene, TransitionScene, PlayScene, MessageScene, EndScene)}
 
 
 class Game:
@@ -510,146 +784,224 @@ class Game:
     run the game
     '''
 
-    def __init__(self):
+    def __init__(self, max_skip=MAX_SKIP, seed=None, record=None, replay=None, pack=LEVEL_PACK):
         '''
-        init everything we need to track the state of the game
+        init everything we need to track the state of the game.
+        max_skip is how many simulation ticks a slow frame can
+        catch up on before the game slows down instead. seed fixes
+        the random numbers, record is a file to save the input to,
+        replay is a recording to play back and pack is the level
+        pack to play
         '''
 
-        self.in_title = True
-        self.in_game = False
-        self.in_trans = False
+        # start the game engine first, the sprite atlas needs it
+        pyxel.init(WIDTH, HEIGHT, title="Jasons Munro: The Game", fps=FPS)
+        screen.invalidate()
+
         self.bg_deg = 0
-        self.in_end = False
+        self.rotate_bg = BG_ROTATE
+        self.background = Background(w=WIDTH, h=HEIGHT)
         self.end_y = 0
-        self.stuff = Stuff()
-        self.player = Player(100, 80, self.stuff)
+        self.playback = None
+        self.recording = None
+        self.record_path = record
+        if replay:
+            self.playback = InputLog.load(replay)
+            seed = self.playback.seed
+        elif seed is None:
+            seed = int.from_bytes(os.urandom(4), 'little')
+        if record:
+            self.recording = InputLog(seed)
+            # closing the window without q still saves the last frames
+            atexit.register(self.save_recording)
+        self.seed = seed
+        pyxel.rseed(seed & 0xffffffff)
+
+        self.controls = Controls()
+        self.stuff = Stuff(pack, seed=seed)
+        self.particles = ParticlePool(seed=seed)
+        self.player = Player(100, 80, self.stuff, self.particles)
         self.level = 1
-        self.title_screen = TitleScreen()
+        self.title_screen = None
+        self.scenes = SceneStack(lambda name: SCENES[name](self))
+        self.scenes.push(TitleScene(self))
         self.border_col = 16
         self.trans_r = 0
+        self.ticks = 0
+        self.timestep = FixedTimestep(pyxel.clock, FPS, max_skip)
+        self.profiler = FrameProfiler(self)
+
+        # saved states for rewinding (backspace), restarting the
+        # level (r) and playing again from the game over screen
+        self.snapshots = SnapshotRing()
+        self.level_snap = None
+        self.first_snap = capture(self)
         
-        # start the game engine
-        pyxel.init(200, 155, title="Jasons Munro: The Game")
         pyxel.playm(0, loop=True)
         pyxel.sounds[0].set("b3b3b3b3", "n", "7742", "s", 5)
         pyxel.sounds[1].set_notes('a1a2a4')
         pyxel.sounds[2].set_notes('d4d2d1')
         pyxel.run(self.update, self.draw)
 
+    # what used to be flags, now read off the scene stack
+
+    @property
+    def in_title(self):
+        return self.scenes.has('title')
+
+    @property
+    def in_trans(self):
+        return self.scenes.has('trans')
+
+    @property
+    def in_game(self):
+        return self.scenes.has('play')
+
+    @property
+    def in_end(self):
+        return self.scenes.has('end')
+
     def transition(self):
         '''
-        transition effect between the title screen and levels
+        advance the transition effect between the title screen and
+        levels
+        '''
+
+        self.player.bullets.clear()
+        self.trans_r += 5
+        self.particles.burst(100, 80, 8, 1.5, 20, (self.level + 4, 7), radius=self.trans_r)
+        self.particles.tick()
+        if self.trans_r > 140:
+            self.player.cant_die = self.ticks
+            if self.level == 5:
+                self.scenes.rebuild(['play', 'end'])
+            else:
+                self.scenes.rebuild(['play'])
+                self.level_snap = capture(self)
+
+    def draw_transition(self):
+        '''
+        render the transition effect, on the UI layer so it covers
+        the title screen underneath
         '''
 
         if self.level == 5:
-            pyxel.circb(100, 80, self.trans_r, 4)
+            screen.circb(100, 80, self.trans_r, 4, layer=UI)
         else:
-            pyxel.circ(100, 80, self.trans_r, (self.level + 4))
+            screen.circ(100, 80, self.trans_r, (self.level + 4), layer=UI)
         if self.level == 4:
-            pyxel.text(80, 75, f'LAST LEVEL', 0)
+            screen.text(80, 75, f'LAST LEVEL', 0, layer=UI)
         elif self.level != 5:
-            pyxel.text(85, 75, f'LEVEL: {self.level}', 0)
-        self.trans_r += 5
-        if self.trans_r > 140:
-            self.player.cant_die = pyxel.frame_count
-            self.in_trans = False
-            self.in_title = False
-            self.in_game = True
-            if self.level == 5:
-                self.in_end = True
+            screen.text(85, 75, f'LEVEL: {self.level}', 0, layer=UI)
 
     def update(self):
         '''
-        state updates, called on each frame in the game loop
+        called on each frame in the game loop. Input is handled once
+        per frame, then the simulation runs as many fixed ticks as
+        the time since the last frame calls for
         '''
 
-        # space to restart at the game over screen
-        if self.in_end and pyxel.btnp(pyxel.KEY_SPACE):
-            pyxel.reset()
+        self.profiler.begin_frame()
+
+        # input comes from the recording until it runs out
+        buttons = self.controls
+        played = self.playback is not None and not self.playback.done()
+        if played:
+            buttons.bits, ticks = self.playback.next_frame()
+        else:
+            buttons.poll()
+            ticks = self.timestep.advance()
 
         # q to quit
-        if pyxel.btn(pyxel.KEY_Q):
+        if buttons.held(controls.QUIT):
+            self.save_recording()
             pyxel.quit()
 
-        # enter to continue from message screen
-        if self.stuff.current_msg and (pyxel.btn(pyxel.KEY_RETURN) or pyxel.btnp(pyxel.GAMEPAD1_BUTTON_B)):
-            if self.stuff.current_mtype == 'D':
-                self.player.cant_die = pyxel.frame_count
-            self.player.is_dead = False
-            self.stuff.current_mtype = None
-            self.stuff.current_msg = None
+        # play again, restart the level or rewind, nothing else
+        # happens on a frame that does one of those
+        if self.jump(buttons):
+            ticks = 0
+        else:
+            self.scenes.input(buttons)
 
-        # space to leave title screen
-        if (pyxel.btnp(pyxel.KEY_SPACE) or pyxel.btnp(pyxel.GAMEPAD1_BUTTON_A)) and self.in_title:
-            self.transition()
-            self.in_trans = True
+        for _ in range(ticks):
+            self.tick()
 
-    def end_screen(self):
+        if self.recording is not None:
+            self.recording.record(buttons.bits, ticks, state_checksum(self))
+            if len(self.recording) % 300 == 0:
+                self.save_recording()
+        elif played:
+            self.playback.verify(state_checksum(self))
+
+    def jump(self, buttons):
         '''
-        render game over screen
+        space at the game over screen starts over, r goes back to the
+        start of the level and holding backspace rewinds. Returns
+        True if the game was put back to a snapshot
         '''
 
-        pyxel.text(60, self.end_y, 'GAME OVER', 4, self.title_screen.font)
-        pyxel.text(85, self.end_y + 30, 'You Won!', 4)
-        if self.player.dead_count == 1:
-            pyxel.text(55, self.end_y + 40, f'(but you died {self.player.dead_count} time)', 9)
-        elif self.player.dead_count > 1:
-            pyxel.text(55, self.end_y + 40, f'(but you died {self.player.dead_count} times)', 9)
-        if self.end_y < 50:
-            self.end_y += 1
+        if self.in_end and buttons.held(controls.FIRE):
+            self.restart()
+        elif buttons.held(controls.RESTART) and self.level_snap is not None and not self.in_end:
+            restore(self, self.level_snap)
+            self.snapshots.clear()
+        elif buttons.held(controls.REWIND) and len(self.snapshots):
+            restore(self, self.snapshots.pop())
         else:
-            pyxel.text(45, 100, 'Press spacebar to play again', 1)
-    
-    def draw(self):
+            return False
+        return True
+
+    def restart(self):
         '''
-        draw updates, called on each frame of the game loop
+        back to the title screen for another game. This used to be a
+        pyxel.reset(), which restarts the whole program. The random
+        numbers carry on so it isn't the same game again
         '''
 
-        if not self.in_end:
-            pyxel.cls(0)
+        restore(self, self.first_snap, rng=False)
+        self.snapshots.clear()
+        self.level_snap = None
 
-        # game finished show end screen
-        if self.in_end:
-            pyxel.cls(0)
-            self.end_screen()
-            return
+    def save_recording(self):
+        '''
+        write what has been recorded so far
+        '''
 
-        # start new level
-        if self.level in self.stuff.stuff_map and len(self.stuff.found) == len(self.stuff.stuff_map[self.level]):
-            pyxel.cls(0)
-            self.stuff.found = []
-            self.trans_r = 0
-            self.level += 1
-            self.player.level += 1
-            self.stuff.level += 1
-            self.transition()
-            self.in_trans = True
-
-        # showing a message box
-        if self.stuff.current_msg:
-            #pyxel.bltm(0, 0, 0, 0, 0, 200, 155, rotate=self.bg_deg, scale=1.5)
-            self.stuff.msg(self.stuff.current_msg, self.stuff.current_mtype)
-            return
+        if self.recording is not None:
+            self.recording.save(self.record_path)
+
+    def tick(self):
+        '''
+        advance the game state by one fixed step
+        '''
+
+        self.ticks += 1
+        self.scenes.tick()
+
+    def draw(self):
+        '''
+        draw updates, called on each frame of the game loop
+        '''
 
-        # title screen
-        if self.in_title:
-            self.title_screen.draw()
+        screen.begin()
+        self.render()
+        screen.flush()
+        self.profiler.end_frame()
 
-        # transition screen
-        if self.in_trans:
-            self.player.bullets = []
-            self.transition()
+    def render(self):
+        '''
+        draw the current screen. Nothing here changes the game state
+        '''
 
-        # game screen
-        if not self.in_trans and not self.in_end and self.in_game:
-            #self.bg_deg += .01
-            #if self.bg_deg == 360:
-                #self.bg_deg = 0
-            #pyxel.bltm(0, 0, 0, 0, 0, 200, 155, rotate=self.bg_deg, scale=1)
-            self.player.update()
-            self.stuff.update()
-            self.stuff.in_sound = False
+        screen.cls(0)
+        self.scenes.draw()
 
 
 if __name__ == "__main__":
-    Game()
+    parser = argparse.ArgumentParser(description='Jason Munro: The Game')
+    parser.add_argument('--seed', type=int, help='seed for the random numbers')
+    parser.add_argument('--record', metavar='FILE', help='record the input to FILE')
+    parser.add_argument('--replay', metavar='FILE', help='play back a recording')
+    args = parser.parse_args()
+    Game(seed=args.seed, record=args.record, replay=args.replay)
@@ -0,0 +1,48 @@
+from collections import OrderedDict
+
+from backend import pyxel
+from render import screen
+
+
+class PanelCache:
+    '''
+    message windows rendered once into off-screen images and then
+    blitted each frame. When the images would take up more than
+    one image bank worth of pixels the least recently shown panel
+    gets dropped
+    '''
+
+    def __init__(self, budget=256 * 256):
+        '''
+        budget is the max number of cached pixels
+        '''
+
+        self.budget = budget
+        self.used = 0
+        self.panels = OrderedDict()
+        self.renders = 0
+
+    def draw(self, key, x, y, w, h, render, *args):
+        '''
+        show the panel for key at x, y. If it isn't cached yet
+        render(img, *args) is called to draw it in panel
+        coordinates
+        '''
+
+        img = self.panels.get(key)
+        if img is None:
+            while self.panels and self.used + w * h > self.budget:
+                _, old = self.panels.popitem(last=False)
+                self.used -= old.width * old.height
+            img = pyxel.Image(w, h)
+            render(img, *args)
+            self.renders += 1
+            self.panels[key] = img
+            self.used += w * h
+        else:
+            self.panels.move_to_end(key)
+        screen.blt(x, y, img, 0, 0, w, h)
+
+    def clear(self):
+        self.panels.clear()
+        self.used = 0
@@ -0,0 +1,130 @@
+'''
+particles for explosions, sparks and debris. Every particle lives
+in one fixed size set of numpy arrays (position, velocity, life,
+color) and new ones are written at a ring cursor, so when the pool
+is full the oldest get overwritten. A tick moves all of them with a
+handful of vector operations.
+
+Each particle is a pset when drawn, so there's also a budget: once
+more than that many are alive the oldest are dropped, which keeps
+the cost of a frame flat however much is going on. They are only
+for show, nothing in the game state depends on them
+'''
+
+import math
+
+import numpy as np
+
+from render import EFFECTS, screen
+
+
+class ParticlePool:
+    '''
+    fixed capacity pool of particles. spawned counts every particle
+    ever emitted, the slot of particle n is n % capacity
+    '''
+
+    def __init__(self, capacity=4096, budget=512, gravity=0.06, drag=0.95, seed=None):
+        '''
+        budget is the most particles alive (and drawn) at once.
+        gravity is added to the y speed and speeds are multiplied
+        by drag every tick
+        '''
+
+        self.capacity = capacity
+        self.budget = min(budget, capacity)
+        self.gravity = gravity
+        self.drag = drag
+        self.x = np.zeros(capacity, dtype=np.float32)
+        self.y = np.zeros(capacity, dtype=np.float32)
+        self.vx = np.zeros(capacity, dtype=np.float32)
+        self.vy = np.zeros(capacity, dtype=np.float32)
+        self.life = np.zeros(capacity, dtype=np.int16)
+        self.col = np.zeros(capacity, dtype=np.uint8)
+        self.rng = np.random.default_rng(seed)
+        self.spawned = 0
+        self.alive = 0
+        self.dropped = 0
+
+    def __len__(self):
+        return self.alive
+
+    def burst(self, x, y, count, speed, life, colors, radius=0):
+        '''
+        count particles flying out from x, y in every direction at up
+        to speed pixels per tick, living up to life ticks, each one
+        a random pick from colors. With a radius they start on a
+        circle that size instead of in the middle
+        '''
+
+        count = min(count, self.capacity)
+        if count <= 0:
+            return
+        start = self.spawned % self.capacity
+        if start + count <= self.capacity:
+            idx = slice(start, start + count)
+        else:
+            idx = (start + np.arange(count)) % self.capacity
+        self.spawned += count
+        self.alive -= int(np.count_nonzero(self.life[idx]))
+        # one draw for everything, each numpy random call costs more
+        # than the maths for a burst
+        angle, fast, ttl, pick = self.rng.random((4, count))
+        angle *= 2 * math.pi
+        dx, dy = np.cos(angle), np.sin(angle)
+        fast = speed * (0.25 + 0.75 * fast)
+        self.x[idx] = x + dx * radius
+        self.y[idx] = y + dy * radius
+        self.vx[idx] = dx * fast
+        self.vy[idx] = dy * fast
+        shortest = max(life // 2, 1)
+        self.life[idx] = shortest + (ttl * (life + 1 - shortest)).astype(np.int16)
+        self.col[idx] = np.asarray(colors, dtype=np.uint8)[(pick * len(colors)).astype(np.intp)]
+        self.alive += count
+        if self.alive > self.budget:
+            self.trim()
+
+    def trim(self):
+        '''
+        drop the oldest particles until no more than budget are alive
+        '''
+
+        extra = self.alive - self.budget
+        if extra <= 0:
+            return
+        live = np.flatnonzero(self.life)
+        # oldest first: how long ago each slot was written
+        age = (self.spawned - 1 - live) % self.capacity
+        oldest = live[np.argpartition(-age, extra - 1)[:extra]]
+        self.life[oldest] = 0
+        self.alive -= extra
+        self.dropped += extra
+
+    def tick(self):
+        '''
+        move everything one step, then age it
+        '''
+
+        if not self.alive:
+            return
+        self.x += self.vx
+        self.y += self.vy
+        self.vy += self.gravity
+        self.vx *= self.drag
+        self.vy *= self.drag
+        np.subtract(self.life, 1, out=self.life, where=self.life > 0)
+        self.alive = int(np.count_nonzero(self.life))
+
+    def draw(self, layer=EFFECTS):
+        if not self.alive:
+            return
+        live = np.flatnonzero(self.life)
+        pset = screen.pset
+        for x, y, col in zip(np.floor(self.x[live]).astype(np.int32).tolist(),
+                             np.floor(self.y[live]).astype(np.int32).tolist(),
+                             self.col[live].tolist()):
+            pset(x, y, col, layer)
+
+    def clear(self):
+        self.life[:] = 0
+        self.alive = 0
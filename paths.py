@@ -0,0 +1,201 @@
+'''
+precomputed motion paths for stuff. An item in the level JSON can
+name a path instead of moving in a straight line:
+
+    {"d": "x", "t": "F", "x": 0, "y": 60, ..., "path": "sine"}
+
+When a level loads every path it uses is worked out once for that
+level's speed into a table of offsets, so moving an item is just
+stepping an index into the table. No trig happens while playing.
+
+Two kinds of path:
+
+    travelling   sine, zigzag. Cross the screen in direction d like
+                 the straight movers, wrapping back to the start.
+                 x (or y for "d": "y") is where along the way the
+                 item starts, the other one is the middle of the wave
+    loops        orbit, bezier. Go round and round a fixed spot, x, y
+                 being the middle of the loop. "d": "y" turns the
+                 loop on its side. With "around" set to the msg of
+                 another item the loop follows that item instead:
+
+    {"d": "x", "t": "S", ..., "path": "orbit", "around": "BOSS"}
+
+Add more with the @path decorator. A builder gets the speed and the
+length of the screen in the direction of travel and returns the
+along and across offsets for every tick, plus whether it travels
+'''
+
+import math
+
+import numpy as np
+
+PATHS = {}
+
+
+def path(name):
+    '''
+    register a path builder under name
+    '''
+
+    def register(func):
+        PATHS[name] = func
+        return func
+    return register
+
+
+def resample(xs, ys, speed):
+    '''
+    points every speed pixels along a closed curve given as a dense
+    list of points, so loops move at the same speed as everything else
+    '''
+
+    xs = np.append(xs, xs[0])
+    ys = np.append(ys, ys[0])
+    dist = np.concatenate(([0.0], np.cumsum(np.hypot(np.diff(xs), np.diff(ys)))))
+    count = max(int(round(dist[-1] / speed)), 1)
+    at = np.arange(count) * (dist[-1] / count)
+    return np.interp(at, dist, xs), np.interp(at, dist, ys)
+
+
+@path('sine')
+def sine(speed, span, amplitude=12, wavelength=80):
+    along = np.arange(0, span + 1 + speed, speed, dtype=float)
+    return along, amplitude * np.sin(along * (2 * math.pi / wavelength)), True
+
+
+@path('zigzag')
+def zigzag(speed, span, amplitude=12, wavelength=60):
+    along = np.arange(0, span + 1 + speed, speed, dtype=float)
+    phase = (along / wavelength) % 1.0
+    return along, amplitude * (4 * np.abs(phase - 0.5) - 1), True
+
+
+@path('orbit')
+def orbit(speed, span, radius=40):
+    angle = np.linspace(0, 2 * math.pi, 720, endpoint=False)
+    xs, ys = resample(radius * np.cos(angle), radius * np.sin(angle), speed)
+    return xs, ys, False
+
+
+@path('bezier')
+def bezier(speed, span):
+    '''
+    figure eight out of four cubic Bézier curves
+    '''
+
+    curves = (
+        ((0, 0), (15, -20), (35, -20), (35, 0)),
+        ((35, 0), (35, 20), (15, 20), (0, 0)),
+        ((0, 0), (-15, -20), (-35, -20), (-35, 0)),
+        ((-35, 0), (-35, 20), (-15, 20), (0, 0)),
+    )
+    t = np.linspace(0, 1, 200, endpoint=False)[:, None]
+    points = []
+    for p0, p1, p2, p3 in curves:
+        p0, p1, p2, p3 = (np.array(p, dtype=float) for p in (p0, p1, p2, p3))
+        points.append((1 - t) ** 3 * p0 + 3 * (1 - t) ** 2 * t * p1 + 3 * (1 - t) * t ** 2 * p2 + t ** 3 * p3)
+    points = np.concatenate(points)
+    xs, ys = resample(points[:, 0], points[:, 1], speed)
+    return xs, ys, False
+
+
+class PathTable:
+    '''
+    the path tables for one level and where each item is on its path.
+    All the tables are stored end to end in x and y, item i uses
+    x[base[i]:base[i] + length[i]] as offsets from (ox[i], oy[i]) and
+    is currently at index step[i]. For an item going around another
+    one target[i] is that item and (ox[i], oy[i]) is relative to it
+    '''
+
+    def __init__(self, items, speed, width, height):
+        '''
+        build the tables for every (path, direction) used by items,
+        an EntityStore, at speed pixels per tick
+        '''
+
+        count = len(items)
+        self.base = np.zeros(count, dtype=np.intp)
+        self.length = np.ones(count, dtype=np.intp)
+        self.step = np.zeros(count, dtype=np.intp)
+        self.ox = np.zeros(count, dtype=np.int32)
+        self.oy = np.zeros(count, dtype=np.int32)
+        self.target = np.full(count, -1, dtype=np.intp)
+        tables = {}
+        xs, ys = [], []
+        size = 0
+        for idx, name in enumerate(items.path):
+            if name is None:
+                continue
+            if name not in PATHS:
+                raise ValueError(f'unknown path {name!r}')
+            vertical = bool(items.vertical[idx])
+            key = (name, vertical)
+            if key not in tables:
+                along, across, travels = PATHS[name](speed, height if vertical else width)
+                along = np.rint(along).astype(np.int32)
+                across = np.rint(across).astype(np.int32)
+                tx, ty = (across, along) if vertical else (along, across)
+                tables[key] = (size, len(tx), travels)
+                xs.append(tx)
+                ys.append(ty)
+                size += len(tx)
+            base, length, travels = tables[key]
+            self.base[idx] = base
+            self.length[idx] = length
+            x, y = int(items.x[idx]), int(items.y[idx])
+            if travels:
+                # start where the level put it along the way
+                start = max(y if vertical else x, 0)
+                self.step[idx] = min(start // speed, length - 1)
+                if vertical:
+                    y = start % speed
+                else:
+                    x = start % speed
+            around = items.around[idx]
+            if around is not None:
+                if travels:
+                    raise ValueError(f"a {name} path can't go around anything")
+                if around not in items.msg:
+                    raise ValueError(f'nothing called {around!r} to go around')
+                target = self.target[idx] = items.msg.index(around)
+                # middle of the loop on the middle of the target
+                x = (int(items.w[target]) - int(items.w[idx])) // 2
+                y = (int(items.h[target]) - int(items.h[idx])) // 2
+            self.ox[idx] = x
+            self.oy[idx] = y
+        following = self.target >= 0
+        if following[self.target[following]].any():
+            raise ValueError("can't go around something that is going around")
+        self.follows = bool(following.any())
+        self.x = np.concatenate(xs) if xs else np.zeros(0, dtype=np.int32)
+        self.y = np.concatenate(ys) if ys else np.zeros(0, dtype=np.int32)
+        self.moving = np.flatnonzero(items.on_path)
+        self.place(items, self.moving)
+
+    def place(self, items, idx):
+        '''
+        put items idx where their step says they are. Items going
+        around another one are moved along with it afterwards
+        '''
+
+        pos = self.base[idx] + self.step[idx]
+        items.x[idx] = self.ox[idx] + self.x[pos]
+        items.y[idx] = self.oy[idx] + self.y[pos]
+        if self.follows:
+            idx = idx[self.target[idx] >= 0]
+            items.x[idx] += items.x[self.target[idx]]
+            items.y[idx] += items.y[self.target[idx]]
+
+    def advance(self, items):
+        '''
+        move every live item on a path one step along it
+        '''
+
+        idx = self.moving[items.alive[self.moving]]
+        if not len(idx):
+            return
+        self.step[idx] += 1
+        self.step[idx] %= self.length[idx]
+        self.place(items, idx)
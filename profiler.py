@@ -0,0 +1,222 @@
+import sys
+import time
+from array import array
+
+from backend import pyxel
+from render import screen
+
+BUDGET_MS = 1000 / 30
+
+
+class Ring:
+    '''
+    fixed size ring buffer of floats
+    '''
+
+    def __init__(self, size):
+        self.values = array('d', [0.0]) * size
+        self.size = size
+        self.pos = 0
+        self.count = 0
+
+    def push(self, value):
+        self.values[self.pos] = value
+        self.pos = (self.pos + 1) % self.size
+        self.count = min(self.count + 1, self.size)
+
+    def ordered(self):
+        '''
+        stored values from oldest to newest
+        '''
+
+        if self.count < self.size:
+            return self.values[:self.count].tolist()
+        return (self.values[self.pos:] + self.values[:self.pos]).tolist()
+
+    def percentile(self, pct):
+        if not self.count:
+            return 0.0
+        values = sorted(self.values[:self.count])
+        return values[int(pct / 100 * (self.count - 1))]
+
+
+class FrameProfiler:
+    '''
+    times the main pieces of each frame into ring buffers. F1 turns
+    it on and off and F2 writes the buffers out as CSV. While it's
+    off nothing is wrapped so it costs nothing. Times are inclusive,
+    so move_bullets is also counted inside player.update. Targets are
+    looked up again every frame, so objects that come and go with
+    the scenes (the title screen) are timed whenever they exist and
+    never kept alive by the profiler
+    '''
+
+    def __init__(self, game, size=300):
+        '''
+        size is how many frames of history to keep
+        '''
+
+        self.game = game
+        self.size = size
+        self.enabled = False
+        self.clock = time.perf_counter
+        self.sections = {
+            'title': (lambda: game.title_screen, 'draw'),
+            'player.update': (lambda: game.player, 'update'),
+            'player.draw': (lambda: game.player, 'draw'),
+            'bullets': (lambda: game.player, 'move_bullets'),
+            'stuff.update': (lambda: game.stuff, 'update'),
+            'stuff.draw': (lambda: game.stuff, 'draw'),
+            'msg': (lambda: game.stuff, 'msg'),
+            'transition': (lambda: game, 'transition'),
+            'background': (lambda: game.background, 'frame'),
+            'particles': (lambda: game.particles, 'tick'),
+            'particles.draw': (lambda: game.particles, 'draw'),
+            'flush': (lambda: screen, 'flush'),
+        }
+        self.wrapped = {}
+        self.reset()
+
+    def reset(self):
+        self.rings = {name: Ring(self.size) for name in ('frame', *self.sections, 'draw_calls', 'entities')}
+        self.current = dict.fromkeys(self.sections, 0.0)
+        self.stats = {}
+        self.frames = 0
+        self.frame_start = None
+        self.draw_calls = 0
+
+    def poll(self):
+        '''
+        check the hotkeys, called once per frame
+        '''
+
+        if pyxel.btnp(pyxel.KEY_F1):
+            self.toggle()
+        if self.enabled and pyxel.btnp(pyxel.KEY_F2):
+            self.export_csv()
+
+    def toggle(self):
+        if self.enabled:
+            self.unwrap()
+        else:
+            self.reset()
+            self.wrap()
+        self.enabled = not self.enabled
+        screen.invalidate()
+
+    def wrap(self):
+        '''
+        replace each instrumented method with a timed version on
+        the instance. Targets that changed since the last call are
+        let go of and the new ones wrapped
+        '''
+
+        wrapped = self.wrapped
+        for name, (target, method) in self.sections.items():
+            obj = target()
+            old = wrapped.get(name)
+            if old is not None and old[0] is obj:
+                continue
+            if old is not None:
+                old[0].__dict__.pop(method, None)
+                del wrapped[name]
+            if obj is not None:
+                obj.__dict__[method] = self.timed(name, getattr(obj, method))
+                wrapped[name] = (obj, method)
+
+    def unwrap(self):
+        for obj, method in self.wrapped.values():
+            obj.__dict__.pop(method, None)
+        self.wrapped = {}
+
+    def timed(self, name, func):
+        current = self.current
+        clock = self.clock
+
+        def wrapper(*args, **kwargs):
+            start = clock()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                current[name] += clock() - start
+        return wrapper
+
+    def begin_frame(self):
+        '''
+        called at the top of Game.update
+        '''
+
+        self.poll()
+        if self.enabled:
+            self.wrap()
+            self.frame_start = self.clock()
+            self.draw_calls = pyxel.draw_calls
+
+    def end_frame(self):
+        '''
+        called at the end of Game.draw. Saves this frame's numbers
+        and draws the overlay
+        '''
+
+        if not self.enabled or self.frame_start is None:
+            return
+        rings = self.rings
+        rings['frame'].push((self.clock() - self.frame_start) * 1000)
+        for name, spent in self.current.items():
+            rings[name].push(spent * 1000)
+            self.current[name] = 0.0
+        rings['draw_calls'].push(pyxel.draw_calls - self.draw_calls)
+        game = self.game
+        rings['entities'].push(int(game.stuff.items.alive.sum()) + len(game.player.bullets) + len(game.particles))
+        self.frames += 1
+        if self.frames % 10 == 1:
+            self.stats = {name: (ring.percentile(50), ring.percentile(99)) for name, ring in rings.items()}
+        self.draw()
+
+    def draw(self):
+        '''
+        overlay with p50/p99 per section and a sparkline of total
+        frame time, red where a frame went over budget
+        '''
+
+        lines = ['frame', *self.sections]
+        h = len(lines) * 7 + 34
+        pyxel.rect(0, 0, 112, h, 0)
+        pyxel.rectb(0, 0, 112, h, 5)
+        pyxel.text(3, 3, 'ms          p50   p99', 13)
+        for row, name in enumerate(lines):
+            p50, p99 = self.stats.get(name, (0.0, 0.0))
+            col = 8 if p99 > BUDGET_MS else 7
+            pyxel.text(3, 10 + row * 7, f'{name:<13}{p50:5.1f} {p99:5.1f}', col)
+
+        # sparkline of the last 100 frames, scaled so the budget is the top
+        top = 10 + len(lines) * 7 + 2
+        history = self.rings['frame'].ordered()[-100:]
+        for idx, ms in enumerate(history):
+            bar = max(1, min(int(ms / BUDGET_MS * 12), 12))
+            pyxel.rect(6 + idx, top + 12 - bar, 1, bar, 8 if ms > BUDGET_MS else 11)
+        calls = self.rings['draw_calls'].ordered()[-1:] or [0]
+        ents = self.rings['entities'].ordered()[-1:] or [0]
+        pyxel.text(3, top + 15, f'draws {int(calls[0])}  live {int(ents[0])}', 13)
+
+    def export_csv(self, path=None):
+        '''
+        write every frame we have as CSV, one row per frame. In
+        the browser it goes to the console since there's nowhere
+        to save it
+        '''
+
+        names = list(self.rings)
+        columns = [self.rings[name].ordered() for name in names]
+        rows = [','.join(names)]
+        for values in zip(*columns):
+            rows.append(','.join(f'{value:.3f}' for value in values))
+        text = '\n'.join(rows) + '\n'
+        if sys.platform == 'emscripten':
+            print(text)
+            return None
+        path = path or time.strftime('profile_%Y%m%d_%H%M%S.csv')
+        with open(path, 'w') as f:
+            f.write(text)
+        print(f'wrote {len(rows) - 1} frames to {path}')
+        return path
@@ -0,0 +1,221 @@
+'''
+per-frame render queue. Drawing during a frame gets queued here
+instead of going straight to pyxel, then flush() sends it on in
+one go. On the way it drops anything that would land completely
+off screen, throws away whatever a later cls would paint over
+anyway, and groups commands that use the same function and source
+image/font together.
+
+Reordering only happens inside a layer. Anything that has to end
+up on top of something else goes in a higher layer.
+
+Each flushed frame is kept around. If the next one queues exactly
+the same commands nothing gets sent to pyxel at all (the screen
+still has the last frame on it), and if only a few commands changed
+just the box around them is cleared and redrawn
+'''
+
+from backend import pyxel
+
+BACKGROUND = 0
+WORLD = 1
+EFFECTS = 2
+UI = 3
+
+
+class RenderQueue:
+    '''
+    pyxel-like drawing functions that queue commands. Each command
+    is (layer, state, seq, name, args, box), state being the function
+    name plus the image or font it uses, so sorting groups them
+    without changing the order within a group. Images and fonts are
+    numbered in the order the frame first uses them, so which group
+    draws first doesn't depend on where they are in memory. box is
+    the screen area it can touch as x0, y0, x1, y1
+    '''
+
+    def __init__(self, max_dirty=0.5):
+        '''
+        a partial redraw is only done when the changed area is
+        less than max_dirty of the screen
+        '''
+
+        self.max_dirty = max_dirty
+        self.commands = []
+        self.sources = {}
+        self.clear = None
+        self.width = 0
+        self.height = 0
+        self.font_w = 4
+        self.font_h = 6
+        self.culled = 0
+        self.flushed = 0
+        self.last = None
+        self.last_clear = None
+        self.skipped = 0
+        self.partial = 0
+        self.dirty = None
+
+    def begin(self):
+        '''
+        start a new frame, dropping anything left over
+        '''
+
+        self.commands = []
+        self.sources = {}
+        self.clear = None
+        self.width = pyxel.width
+        self.height = pyxel.height
+        self.font_w = pyxel.FONT_WIDTH
+        self.font_h = pyxel.FONT_HEIGHT
+        self.culled = 0
+
+    def invalidate(self):
+        '''
+        something drew to the screen behind our back or an image we
+        blt from changed, so the next frame has to be drawn in full
+        '''
+
+        self.last = None
+
+    def source(self, obj):
+        '''
+        number for an image or font, the first one used this frame
+        is 0. Queued commands keep obj alive so its id can't be reused
+        before the frame is flushed
+        '''
+
+        key = id(obj)
+        num = self.sources.get(key)
+        if num is None:
+            num = self.sources[key] = len(self.sources)
+        return num
+
+    def push(self, layer, state, name, x, y, w, h, args):
+        '''
+        queue a command that covers a w x h box at x, y, unless that
+        box is completely off screen
+        '''
+
+        if x >= self.width or y >= self.height or x + w <= 0 or y + h <= 0:
+            self.culled += 1
+            return
+        self.commands.append((layer, state, len(self.commands), name, args, (x, y, x + w, y + h)))
+
+    def cls(self, col):
+        '''
+        everything queued so far would be painted over, so forget it
+        '''
+
+        self.commands = []
+        self.sources = {}
+        self.clear = col
+
+    def pset(self, x, y, col, layer=WORLD):
+        self.push(layer, ('pset',), 'pset', x, y, 1, 1, (x, y, col))
+
+    def rect(self, x, y, w, h, col, layer=WORLD):
+        self.push(layer, ('rect',), 'rect', x, y, w, h, (x, y, w, h, col))
+
+    def rectb(self, x, y, w, h, col, layer=WORLD):
+        self.push(layer, ('rectb',), 'rectb', x, y, w, h, (x, y, w, h, col))
+
+    def circ(self, x, y, r, col, layer=WORLD):
+        self.push(layer, ('circ',), 'circ', x - r, y - r, r * 2 + 1, r * 2 + 1, (x, y, r, col))
+
+    def circb(self, x, y, r, col, layer=WORLD):
+        self.push(layer, ('circb',), 'circb', x - r, y - r, r * 2 + 1, r * 2 + 1, (x, y, r, col))
+
+    def elli(self, x, y, w, h, col, layer=WORLD):
+        self.push(layer, ('elli',), 'elli', x, y, w, h, (x, y, w, h, col))
+
+    def text(self, x, y, s, col, font=None, layer=WORLD):
+        '''
+        the built in font is 4x6 per letter. We don't know how wide
+        a TTF font is so those are treated as reaching the right and
+        bottom of the screen. Baked fonts queue their own blts
+        '''
+
+        draw = getattr(font, 'draw', None)
+        if draw is not None:
+            draw(self, x, y, s, col, layer)
+            return
+        if font is None:
+            w, h = len(s) * self.font_w, self.font_h
+        else:
+            w, h = self.width - min(x, 0), self.height - min(y, 0)
+        self.push(layer, ('text', self.source(font)), 'text', x, y, w, h, (x, y, s, col, font))
+
+    def blt(self, x, y, img, u, v, w, h, colkey=None, layer=WORLD):
+        self.push(layer, ('blt', self.source(img)), 'blt', x, y, abs(w), abs(h), (x, y, img, u, v, w, h, colkey))
+
+    def changed(self, frame):
+        '''
+        box around everything that differs from the last frame, None
+        if nothing does, or the whole screen if it can't be narrowed
+        down (different number of commands, or a new clear color)
+        '''
+
+        last = self.last
+        screen = (0, 0, self.width, self.height)
+        if last is None or self.clear != self.last_clear or len(frame) != len(last):
+            return screen
+        boxes = [box for new, old in zip(frame, last)
+                 if new[0] != old[0] or new[1] != old[1]
+                 for box in (new[2], old[2])]
+        if not boxes:
+            return None
+        x0s, y0s, x1s, y1s = zip(*boxes)
+        x0, y0 = max(min(x0s), 0), max(min(y0s), 0)
+        x1, y1 = min(max(x1s), self.width), min(max(y1s), self.height)
+        if (x1 - x0) * (y1 - y0) > self.max_dirty * self.width * self.height:
+            return screen
+        return x0, y0, x1, y1
+
+    def flush(self):
+        '''
+        send the frame to pyxel: at most one cls, then the queued
+        commands sorted by layer and state. Only what changed since
+        the last frame is actually drawn
+        '''
+
+        commands = self.commands
+        commands.sort(key=lambda cmd: cmd[:3])
+        frame = [(name, args, box) for _, _, _, name, args, box in commands]
+        dirty = self.dirty = self.changed(frame)
+        self.commands = []
+        self.sources = {}
+        if dirty is None:
+            self.skipped += 1
+            self.flushed = 0
+            self.clear = None
+            return
+
+        if dirty == (0, 0, self.width, self.height):
+            if self.clear is not None:
+                pyxel.cls(self.clear)
+            draw = frame
+        else:
+            # only redraw inside the changed box
+            self.partial += 1
+            x0, y0, x1, y1 = dirty
+            pyxel.clip(x0, y0, x1 - x0, y1 - y0)
+            pyxel.rect(x0, y0, x1 - x0, y1 - y0, self.clear)
+            draw = [cmd for cmd in frame
+                    if cmd[2][0] < x1 and cmd[2][1] < y1 and cmd[2][2] > x0 and cmd[2][3] > y0]
+
+        funcs = {}
+        for name, args, _ in draw:
+            func = funcs.get(name)
+            if func is None:
+                func = funcs[name] = getattr(pyxel, name)
+            func(*args)
+        if draw is not frame:
+            pyxel.clip()
+        self.flushed = len(draw)
+        self.last = frame if self.clear is not None else None
+        self.last_clear = self.clear
+        self.clear = None
+
+
+screen = RenderQueue()
@@ -0,0 +1,155 @@
+'''
+input recording and playback. A recording is the random seed plus
+the buttons held and simulation ticks run on every frame, along with
+a checksum of the game state after each frame so playback can tell
+exactly where it stops matching.
+
+    python main.py --record run.rrr      play and record
+    python main.py --replay run.rrr      watch it in the window
+    python replay.py run.rrr             replay headless, as fast as possible
+'''
+
+import struct
+import sys
+import time
+import zlib
+from array import array
+
+MAGIC = b'RRRP'
+VERSION = 2
+HEADER = struct.Struct('<4sBQI')
+RUN = struct.Struct('<II')
+
+
+def state_checksum(game):
+    '''
+    crc32 of everything that affects how the game plays out
+    '''
+
+    player = game.player
+    stuff = game.stuff
+    items = stuff.items
+    crc = zlib.crc32(struct.pack(
+        '<iiiiiiiii6?',
+        game.ticks, game.level, game.trans_r, game.end_y,
+        player.x, player.y, player.dead_count, player.cant_die, stuff.level,
+        game.in_title, game.in_game, game.in_trans, game.in_end, player.is_dead,
+        player.fire,
+    ))
+    crc = zlib.crc32(items.x.tobytes(), crc)
+    crc = zlib.crc32(items.y.tobytes(), crc)
+    crc = zlib.crc32(items.alive.tobytes(), crc)
+    for bul in player.bullets:
+        crc = zlib.crc32(struct.pack('<ii', bul.x, bul.y), crc)
+    if stuff.current_msg:
+        crc = zlib.crc32(stuff.current_msg.encode('utf-8'), crc)
+    return crc
+
+
+class InputLog:
+    '''
+    one recorded run. Each frame is stored as buttons | ticks << 16
+    in an array, and runs of identical frames are collapsed when
+    saved
+    '''
+
+    def __init__(self, seed):
+        self.seed = seed
+        self.frames = array('I')
+        self.checksums = array('I')
+        self.pos = 0
+        self.mismatch = None
+
+    def __len__(self):
+        return len(self.frames)
+
+    def record(self, bits, ticks, checksum):
+        self.frames.append(bits | ticks << 16)
+        self.checksums.append(checksum)
+
+    def done(self):
+        return self.pos >= len(self.frames)
+
+    def next_frame(self):
+        '''
+        buttons and tick count for the next frame of playback
+        '''
+
+        frame = self.frames[self.pos]
+        self.pos += 1
+        return frame & 0xffff, frame >> 16
+
+    def verify(self, checksum):
+        '''
+        compare the state after the frame just played with the
+        recording, remembering the first frame that differs
+        '''
+
+        if self.mismatch is None and checksum != self.checksums[self.pos - 1]:
+            self.mismatch = self.pos - 1
+        return self.mismatch is None
+
+    def encode(self):
+        runs = array('I')
+        frames = self.frames
+        idx = 0
+        while idx < len(frames):
+            value = frames[idx]
+            count = 1
+            while idx + count < len(frames) and frames[idx + count] == value:
+                count += 1
+            runs.extend((count, value))
+            idx += count
+        body = zlib.compress(RUN.pack(len(runs) // 2, 0) + runs.tobytes() + self.checksums.tobytes())
+        return HEADER.pack(MAGIC, VERSION, self.seed, len(frames)) + body
+
+    @classmethod
+    def decode(cls, data):
+        magic, version, seed, count = HEADER.unpack_from(data, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError('not a replay file')
+        body = zlib.decompress(data[HEADER.size:])
+        (num_runs, _) = RUN.unpack_from(body, 0)
+        runs = array('I')
+        runs.frombytes(body[RUN.size:RUN.size + num_runs * RUN.size])
+        log = cls(seed)
+        for idx in range(0, len(runs), 2):
+            log.frames.extend(array('I', [runs[idx + 1]]) * runs[idx])
+        log.checksums.frombytes(body[RUN.size + num_runs * RUN.size:])
+        if len(log.frames) != count or len(log.checksums) != count:
+            raise ValueError('replay file is truncated')
+        return log
+
+    def save(self, path):
+        with open(path, 'wb') as f:
+            f.write(self.encode())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            return cls.decode(f.read())
+
+
+def run_headless(path):
+    '''
+    play a recording back with no window as fast as possible.
+    Returns the game and how long it took
+    '''
+
+    import backend
+    from main import Game
+
+    hb = backend.use(backend.HeadlessBackend())
+    game = Game(replay=path)
+    start = time.perf_counter()
+    hb.step(len(game.playback))
+    return game, time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    for name in sys.argv[1:]:
+        game, secs = run_headless(name)
+        log = game.playback
+        fps = log.pos / secs if secs else 0
+        result = 'bit exact' if log.mismatch is None else f'diverged at frame {log.mismatch}'
+        print(f'{name}: {log.pos} frames in {secs:.2f}s ({fps:.0f} fps), {result}')
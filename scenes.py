@@ -0,0 +1,113 @@
+'''
+a stack of scenes (title, level transition, gameplay, message box,
+end screen). Only the scenes at the top get called each frame:
+
+    input   goes to the top scene
+    tick    goes down the stack until a scene that pauses the
+            ones below it
+    draw    starts at the highest scene that covers the whole
+            screen and works up
+
+Scenes load what they need in enter() and let go of it in exit(),
+so nothing from the title screen hangs around once the game starts
+'''
+
+
+class Scene:
+    '''
+    base scene that does nothing. name is what snapshots store
+    '''
+
+    name = None
+    pauses = True
+    opaque = True
+
+    def __init__(self, game):
+        self.game = game
+
+    def enter(self):
+        pass
+
+    def exit(self):
+        pass
+
+    def input(self, buttons):
+        pass
+
+    def tick(self):
+        pass
+
+    def draw(self):
+        pass
+
+
+class SceneStack:
+    '''
+    the scenes currently running, bottom first
+    '''
+
+    def __init__(self, make):
+        '''
+        make(name) returns a new scene, used by rebuild()
+        '''
+
+        self.make = make
+        self.scenes = []
+
+    def __len__(self):
+        return len(self.scenes)
+
+    @property
+    def top(self):
+        return self.scenes[-1] if self.scenes else None
+
+    def has(self, name):
+        for scene in self.scenes:
+            if scene.name == name:
+                return True
+        return False
+
+    def names(self):
+        return [scene.name for scene in self.scenes]
+
+    def push(self, scene):
+        self.scenes.append(scene)
+        scene.enter()
+
+    def pop(self):
+        scene = self.scenes.pop()
+        scene.exit()
+        return scene
+
+    def rebuild(self, names):
+        '''
+        make the stack the scenes in names. Scenes that are already
+        in the right place are kept, the rest exit and new ones enter
+        '''
+
+        keep = 0
+        while keep < min(len(names), len(self.scenes)) and self.scenes[keep].name == names[keep]:
+            keep += 1
+        while len(self.scenes) > keep:
+            self.pop()
+        for name in names[keep:]:
+            self.push(self.make(name))
+
+    def input(self, buttons):
+        if self.scenes:
+            self.scenes[-1].input(buttons)
+
+    def tick(self):
+        scenes = list(self.scenes)
+        for scene in scenes[::-1]:
+            scene.tick()
+            # the scenes below may have just been popped
+            if scene.pauses or self.scenes != scenes:
+                break
+
+    def draw(self):
+        start = len(self.scenes) - 1
+        while start > 0 and not self.scenes[start].opaque:
+            start -= 1
+        for scene in self.scenes[max(start, 0):]:
+            scene.draw()
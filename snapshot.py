@@ -0,0 +1,198 @@
+'''
+binary snapshots of the whole game state, for rewinding and
+restarting without pyxel.reset(). A snapshot is a few hundred bytes
+and taking or restoring one is a handful of struct calls plus a copy
+of the item arrays.
+
+Layout (little endian):
+
+    header   magic 'RRSN', version
+    game     ticks, level, trans_r, end_y, bg_deg
+    scenes   names of the scenes on the stack, bottom first, utf-8
+    title    typewriter position, flags and ticks, zeros once past the title
+    player   position, facing, timers, counters, bullet count
+    bullets  position, start of last move, direction
+    stuff    level, item count, rng state, message lengths
+    items    x and y as int32, alive as packed bits, path step as uint16
+    text     current message type and message, utf-8
+
+Items sizes, colors and messages aren't stored, they come from the
+level pack when a snapshot for another level is restored
+'''
+
+import struct
+from collections import deque
+
+import numpy as np
+
+MAGIC = b'RRSN'
+VERSION = 4
+HEADER = struct.Struct('<4sB')
+GAME = struct.Struct('<IHhhf')
+SCENES = struct.Struct('<B')
+TITLE = struct.Struct('<HBI')
+PLAYER = struct.Struct('<hhBBBIIIIHB')
+BULLET = struct.Struct('<hhhhB')
+STUFF = struct.Struct('<HH16s16sBIHH')
+
+DIRS = ('up', 'down', 'left', 'right')
+NO_DIR = 255
+
+
+def flags(*values):
+    bits = 0
+    for pos, value in enumerate(values):
+        bits |= bool(value) << pos
+    return bits
+
+
+def unflag(bits, count):
+    return [bool(bits >> pos & 1) for pos in range(count)]
+
+
+def capture(game):
+    '''
+    everything needed to put the game back exactly where it is now
+    '''
+
+    player = game.player
+    stuff = game.stuff
+    items = stuff.items
+    title = game.title_screen
+    scenes = ','.join(game.scenes.names()).encode('utf-8')
+    rng = stuff.rng.bit_generator.state
+    msg = (stuff.current_msg or '').encode('utf-8')
+    mtype = (stuff.current_mtype or '').encode('utf-8')
+    out = [
+        HEADER.pack(MAGIC, VERSION),
+        GAME.pack(game.ticks, game.level, game.trans_r, game.end_y, game.bg_deg),
+        SCENES.pack(len(scenes)) + scenes,
+        TITLE.pack(title.pos, flags(title.line1, title.line2), title.frames) if title else TITLE.pack(0, 0, 0),
+        PLAYER.pack(player.x, player.y, DIRS.index(player.last_dir),
+                    DIRS.index(player.move_dir) if player.move_dir else NO_DIR,
+                    flags(player.is_dead, player.fire), player.cant_die, player.dead_count,
+                    player.is_idle, player.in_sound or 0, player.level, len(player.bullets)),
+    ]
+    for bul in player.bullets:
+        out.append(BULLET.pack(bul.x, bul.y, bul.px, bul.py, DIRS.index(bul.dir)))
+    out.append(STUFF.pack(stuff.level, len(items),
+                          rng['state']['state'].to_bytes(16, 'little'),
+                          rng['state']['inc'].to_bytes(16, 'little'),
+                          rng['has_uint32'], rng['uinteger'], len(mtype), len(msg)))
+    out.append(items.x.tobytes())
+    out.append(items.y.tobytes())
+    out.append(np.packbits(items.alive).tobytes())
+    out.append(stuff.paths.step.astype(np.uint16).tobytes())
+    out.append(mtype)
+    out.append(msg)
+    return b''.join(out)
+
+
+def restore(game, data, rng=True):
+    '''
+    put the game back to a snapshot. With rng=False the random
+    numbers carry on from where they are instead of repeating
+    '''
+
+    magic, version = HEADER.unpack_from(data, 0)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError('not a game snapshot')
+    pos = HEADER.size
+
+    (game.ticks, game.level, game.trans_r, game.end_y,
+     game.bg_deg) = GAME.unpack_from(data, pos)
+    pos += GAME.size
+    (size,) = SCENES.unpack_from(data, pos)
+    pos += SCENES.size
+    game.scenes.rebuild(data[pos:pos + size].decode('utf-8').split(','))
+    pos += size
+
+    title = game.title_screen
+    if title:
+        title.pos, bits, title.frames = TITLE.unpack_from(data, pos)
+        title.line1, title.line2 = unflag(bits, 2)
+    pos += TITLE.size
+
+    player = game.player
+    (player.x, player.y, last_dir, move_dir, bits, player.cant_die, player.dead_count,
+     player.is_idle, in_sound, player.level, count) = PLAYER.unpack_from(data, pos)
+    player.last_dir = DIRS[last_dir]
+    player.move_dir = DIRS[move_dir] if move_dir != NO_DIR else None
+    player.is_dead, player.fire = unflag(bits, 2)
+    player.in_sound = in_sound or None
+    pos += PLAYER.size
+    player.bullets.clear()
+    for _ in range(count):
+        x, y, px, py, direction = BULLET.unpack_from(data, pos)
+        bul = player.bullets.spawn(x, y, DIRS[direction])
+        bul.px, bul.py = px, py
+        pos += BULLET.size
+
+    stuff = game.stuff
+    (level, count, state, inc, has_uint32, uinteger,
+     mtype_len, msg_len) = STUFF.unpack_from(data, pos)
+    pos += STUFF.size
+    if level != stuff.level or count != len(stuff.items):
+        stuff.level = level
+        stuff.load_level()
+    if rng:
+        stuff.rng.bit_generator.state = {
+            'bit_generator': 'PCG64',
+            'state': {'state': int.from_bytes(state, 'little'), 'inc': int.from_bytes(inc, 'little')},
+            'has_uint32': has_uint32, 'uinteger': uinteger,
+        }
+    items = stuff.items
+    size = count * 4
+    items.x[:] = np.frombuffer(data, np.int32, count, pos)
+    items.y[:] = np.frombuffer(data, np.int32, count, pos + size)
+    pos += size * 2
+    packed = (count + 7) // 8
+    items.alive[:] = np.unpackbits(np.frombuffer(data, np.uint8, packed, pos), count=count).astype(bool)
+    pos += packed
+    stuff.paths.step[:] = np.frombuffer(data, np.uint16, count, pos)
+    pos += count * 2
+    stuff.found = set(np.flatnonzero(~items.alive).tolist())
+    stuff.grid.clear()
+    stuff.grid.move_all(items.x, items.y, items.w, items.h, items.alive)
+    stuff.current_mtype = data[pos:pos + mtype_len].decode('utf-8') or None
+    pos += mtype_len
+    stuff.current_msg = data[pos:pos + msg_len].decode('utf-8') or None
+
+    # particles are only for show and aren't stored
+    game.particles.clear()
+
+
+class SnapshotRing:
+    '''
+    the most recent snapshots, oldest dropped first once they add
+    up to more than budget bytes
+    '''
+
+    def __init__(self, budget=64 * 1024):
+        self.budget = budget
+        self.used = 0
+        self.snaps = deque()
+
+    def __len__(self):
+        return len(self.snaps)
+
+    def push(self, data):
+        self.snaps.append(data)
+        self.used += len(data)
+        while self.used > self.budget and len(self.snaps) > 1:
+            self.used -= len(self.snaps.popleft())
+
+    def pop(self):
+        '''
+        take the newest snapshot off, None if there aren't any
+        '''
+
+        if not self.snaps:
+            return None
+        data = self.snaps.pop()
+        self.used -= len(data)
+        return data
+
+    def clear(self):
+        self.snaps.clear()
+        self.used = 0
@@ -0,0 +1,97 @@
+from backend import pyxel
+from render import screen
+
+
+class SpriteAtlas:
+    '''
+    off-screen image the player faces and stuff tiles get drawn
+    into once, so each one costs a single blt per frame. Tiles are
+    packed left to right in rows (shelves).
+
+    The atlas is only ever wiped by reset(), which the game calls
+    when a level loads and its tiles don't fit. Wiping it in the
+    middle of a frame would move tiles that blits already queued
+    for that frame still point at
+    '''
+
+    def __init__(self, size=256):
+        self.size = size
+        self.image = pyxel.Image(size, size)
+        self.tiles = {}
+        self.pinned = {}
+        self.shelf_x = 0
+        self.shelf_y = 0
+        self.shelf_h = 0
+
+    def reset(self):
+        '''
+        forget every tile except the pinned ones, which are drawn
+        again straight away. The rest get drawn as they are asked for
+        '''
+
+        self.image.cls(0)
+        screen.invalidate()
+        self.tiles = {}
+        self.shelf_x = 0
+        self.shelf_y = 0
+        self.shelf_h = 0
+        for key, (w, h, render, args) in self.pinned.items():
+            self.tile(key, w, h, render, *args)
+
+    def place(self, w, h):
+        '''
+        find a spot for a w x h tile, returns None if the atlas is full
+        '''
+
+        if self.shelf_x + w > self.size:
+            self.shelf_x = 0
+            self.shelf_y += self.shelf_h
+            self.shelf_h = 0
+        if self.shelf_y + h > self.size or w > self.size:
+            return None
+        u, v = self.shelf_x, self.shelf_y
+        self.shelf_x += w
+        self.shelf_h = max(self.shelf_h, h)
+        return u, v
+
+    def fits(self, sizes):
+        '''
+        true if tiles of all the (w, h) sizes can still be added
+        '''
+
+        shelf = self.shelf_x, self.shelf_y, self.shelf_h
+        try:
+            return all(self.place(w, h) is not None for w, h in sizes)
+        finally:
+            self.shelf_x, self.shelf_y, self.shelf_h = shelf
+
+    def tile(self, key, w, h, render, *args):
+        '''
+        u, v of the tile for key, calling render(img, u, v, *args)
+        to draw it the first time. Raises ValueError if it doesn't fit
+        '''
+
+        uv = self.tiles.get(key)
+        if uv is None:
+            uv = self.place(w, h)
+            if uv is None:
+                raise ValueError(f'{w}x{h} tile does not fit in the atlas')
+            render(self.image, uv[0], uv[1], *args)
+            self.tiles[key] = uv
+        return uv
+
+    def pin(self, key, w, h, render, *args):
+        '''
+        tile() for a tile that has to survive a reset
+        '''
+
+        self.pinned[key] = (w, h, render, args)
+        return self.tile(key, w, h, render, *args)
+
+    def blt(self, x, y, key, w, h, render, *args):
+        '''
+        draw the tile for key at x, y
+        '''
+
+        u, v = self.tile(key, w, h, render, *args)
+        screen.blt(x, y, self.image, u, v, w, h)
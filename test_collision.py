@@ -0,0 +1,124 @@
+'''
+property tests for collision.py against brute force oracles that
+work on actual sets of pixels. Cases are random but seeded, so a
+failure always comes back the same. Run with python -m pytest
+'''
+
+import random
+
+import numpy as np
+
+from collision import SpatialHash, overlap_mask, sweep_times
+
+CASES = 20000
+
+
+def pixels(x, y, w, h):
+    '''
+    every pixel a w x h rect at x, y covers, like pyxel.rect draws it
+    '''
+
+    return {(px, py) for px in range(x, x + w) for py in range(y, y + h)}
+
+
+def span(pos, size):
+    return set(range(pos, pos + size))
+
+
+def random_rect(rng, low=-8, high=16, size=6):
+    return rng.randint(low, high), rng.randint(low, high), rng.randint(1, size), rng.randint(1, size)
+
+
+def oracle_sweep(x, y, dx, dy, w, h, rx, ry, rw, rh):
+    '''
+    first fraction of the move at which the box shares a pixel with
+    the rect, or inf. Space is scaled up by n so every point where
+    the box could start or stop touching the rect, and a point
+    between each pair of them, lands on a whole pixel. Rects are
+    products of their x and y pixels, so checking each axis on its
+    own is the same as checking the 2d pixel sets
+    '''
+
+    n = 2 * max(abs(dx), 1) * max(abs(dy), 1)
+    rect_x, rect_y = span(rx * n, rw * n), span(ry * n, rh * n)
+    for step in range(n):
+        if span(x * n + step * dx, w * n) & rect_x and span(y * n + step * dy, h * n) & rect_y:
+            # overlapping here means it started just after the step before
+            return max(step - 1, 0) / n
+    return np.inf
+
+
+def test_overlap_mask_matches_pixels():
+    rng = random.Random(3)
+    for _ in range(CASES // 100):
+        x, y, w, h = random_rect(rng)
+        rects = [random_rect(rng) for _ in range(100)]
+        xs, ys, ws, hs = (np.array(col) for col in zip(*rects))
+        mask = overlap_mask(x, y, w, h, xs, ys, ws, hs)
+        box = pixels(x, y, w, h)
+        expected = [bool(box & pixels(*rect)) for rect in rects]
+        assert mask.tolist() == expected, (x, y, w, h)
+
+
+def test_overlap_mask_edges():
+    # touching on a side or a corner isn't an overlap, one pixel is
+    assert not overlap_mask(0, 0, 4, 4, np.array([4, 0, 4]), np.array([0, 4, 4]), 4, 4).any()
+    assert overlap_mask(0, 0, 4, 4, np.array([3]), np.array([3]), 4, 4).all()
+    # one rect fully inside another
+    assert overlap_mask(0, 0, 20, 20, np.array([5]), np.array([5]), 1, 1).all()
+    assert overlap_mask(5, 5, 1, 1, np.array([0]), np.array([0]), 20, 20).all()
+
+
+def test_sweep_times_matches_pixels():
+    rng = random.Random(16)
+    cases = []
+    for _ in range(CASES):
+        x, y, w, h = random_rect(rng, -4, 12, 4)
+        dx, dy = rng.randint(-6, 6), rng.randint(-6, 6)
+        cases.append((x, y, dx, dy, w, h) + random_rect(rng, 0, 8, 4))
+    cols = [np.array(col) for col in zip(*cases)]
+    x, y, dx, dy, w, h, rx, ry, rw, rh = cols
+    times = sweep_times(x, y, dx, dy, w, h, rx, ry, rw, rh)
+    for case, got in zip(cases, times.tolist()):
+        expected = oracle_sweep(*case)
+        assert got == expected or abs(got - expected) < 1e-9, case
+
+
+def test_sweep_times_standing_still():
+    # no move is just overlap_mask
+    rng = random.Random(4)
+    for _ in range(CASES // 100):
+        x, y, w, h = random_rect(rng)
+        rects = [random_rect(rng) for _ in range(100)]
+        xs, ys, ws, hs = (np.array(col) for col in zip(*rects))
+        times = sweep_times(x, y, 0, 0, w, h, xs, ys, ws, hs)
+        mask = overlap_mask(x, y, w, h, xs, ys, ws, hs)
+        assert (times == 0).tolist() == mask.tolist()
+        assert np.isinf(times[~mask]).all()
+
+
+def test_spatial_hash_finds_every_overlap():
+    # the grid may return extras, but never miss a real overlap,
+    # including after items move and die
+    rng = np.random.default_rng(5)
+    grid = SpatialHash(200, 155)
+    count = 300
+    xs = rng.integers(-20, 220, count)
+    ys = rng.integers(-20, 175, count)
+    ws = rng.integers(1, 30, count)
+    hs = rng.integers(1, 30, count)
+    alive = np.ones(count, dtype=bool)
+    for _ in range(20):
+        grid.move_all(xs, ys, ws, hs, alive)
+        for _ in range(50):
+            x, y = rng.integers(-10, 210), rng.integers(-10, 165)
+            w, h = rng.integers(1, 20), rng.integers(1, 20)
+            found = set(grid.query(x, y, w, h))
+            hits = np.flatnonzero(overlap_mask(x, y, w, h, xs, ys, ws, hs) & alive)
+            assert set(hits.tolist()) <= found
+        xs += rng.integers(-6, 7, count)
+        ys += rng.integers(-6, 7, count)
+        for key in rng.choice(count, 5, replace=False).tolist():
+            if alive[key]:
+                alive[key] = False
+                grid.remove(key)
@@ -0,0 +1,53 @@
+'''
+tests for timestep.py with a fake clock, so the game runs at the
+right speed whatever rate frames come in at
+'''
+
+import random
+
+import pytest
+
+from timestep import FixedTimestep
+
+
+def run(fps, seconds, jitter=0.0, seed=1):
+    '''
+    frames at fps for seconds, each up to jitter seconds early or
+    late. Returns the ticks for every frame
+    '''
+
+    rng = random.Random(seed)
+    now = [0.0]
+    timestep = FixedTimestep(lambda: now[0], fps=30)
+    ticks = []
+    for frame in range(int(seconds * fps)):
+        now[0] = (frame + 1) / fps + rng.uniform(-jitter, jitter)
+        ticks.append(timestep.advance())
+    return ticks
+
+
+@pytest.mark.parametrize('fps', (20, 25, 30, 40))
+def test_ticks_match_elapsed_time(fps):
+    # 30 ticks for every second that passed, give or take one
+    for jitter in (0.0, 0.001, 0.004):
+        ticks = run(fps, 20, jitter)
+        assert abs(sum(ticks) - 20 * 30) <= 1, (fps, jitter)
+        # and never drifting along the way
+        for seconds in range(1, 20):
+            done = sum(ticks[:seconds * fps])
+            assert abs(done - seconds * 30) <= 2, (fps, jitter, seconds)
+
+
+def test_jitter_at_tick_rate_runs_one_tick_per_frame():
+    assert set(run(30, 100, 0.001)) == {1}
+    assert set(run(30, 100, 0.003)) == {1}
+
+
+def test_long_stall_is_dropped():
+    now = [0.0]
+    timestep = FixedTimestep(lambda: now[0], fps=30, max_skip=4)
+    timestep.advance()
+    now[0] = 10.0
+    assert timestep.advance() == 5
+    now[0] = 10.0 + 1 / 30
+    assert timestep.advance() == 1
@@ -0,0 +1,56 @@
+class FixedTimestep:
+    '''
+    turns elapsed time into a whole number of fixed length
+    simulation ticks. When rendering falls behind the game runs
+    several ticks per drawn frame instead of slowing down, up to
+    max_skip extra ticks per frame. Past that the extra time is
+    dropped so a long stall can't snowball.
+
+    pyxel.run already calls update about once per tick, just not
+    exactly on time. So lag within snap of a whole number of ticks
+    runs exactly that many, otherwise a frame that is a little early
+    runs no tick and the next one runs two
+    '''
+
+    def __init__(self, clock, fps=30, max_skip=4, snap=0.25):
+        '''
+        clock is a function returning the current time in seconds,
+        snap is a fraction of a tick
+        '''
+
+        self.clock = clock
+        self.step = 1 / fps
+        self.max_skip = max_skip
+        self.snap = snap
+        self.last = None
+        self.lag = 0.0
+        self.skipped = 0
+
+    def advance(self):
+        '''
+        how many ticks to run for this frame
+        '''
+
+        now = self.clock()
+        if self.last is None:
+            self.last = now - self.step
+        self.lag += now - self.last
+        self.last = now
+
+        ticks = self.lag / self.step
+        whole = round(ticks)
+        if whole and abs(ticks - whole) <= self.snap:
+            # on time give or take some jitter. What's left over (a
+            # little under or over 0) carries to the next frame so the
+            # ticks still add up to the time that passed
+            ticks = whole
+        else:
+            ticks = int(ticks)
+        if ticks > self.max_skip + 1:
+            ticks = self.max_skip + 1
+            self.lag = 0.0
+        else:
+            self.lag -= ticks * self.step
+        if ticks > 1:
+            self.skipped += ticks - 1
+        return ticks